@@ -0,0 +1 @@
+"""Benchmarks do caminho de dados das páginas (rodar com `python -m benchmarks.<nome>`)."""
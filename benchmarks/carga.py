@@ -0,0 +1,265 @@
+"""
+Teste de carga das páginas com várias sessões simultâneas.
+
+Reproduz a troca de turno, quando dezenas de supervisores abrem o painel ao
+mesmo tempo. Cada sessão é um `AppTest` do Streamlit que abre o dashboard.py,
+navega até uma página e faz interações aleatórias (filtros, seleções, opções da
+tabela). As sessões rodam em paralelo, em threads do mesmo processo, e
+compartilham os caches, como as sessões de um servidor real.
+
+Nada sai da máquina:
+
+- o Google Sheets é substituído pelo `ClienteSintetico` (troca-se o
+  `obter_cliente` da camada de dados), com uma aba gerada por
+  `dados_sinteticos` para cada planilha configurada em utils/bases.py;
+- o AppTest não aciona o `file_uploader`, então na Produção Diária ele devolve
+  planilhas .xlsx sintéticas, como se tivessem sido enviadas;
+- o repositório local e o cache de planilhas ficam numa pasta temporária.
+
+Uma sessão de aquecimento por página (caches frios) é medida à parte. São
+informados a vazão (reruns por segundo), a latência de cada rerun (p50, p90,
+p99 e máximo) por página e a memória do processo (RSS) antes e depois das
+sessões. As sessões ficam abertas até o fim, como abas do navegador, então o
+crescimento da memória dividido pelo número de sessões é o custo de cada uma.
+
+    python -m benchmarks.carga --sessoes 30 --concorrencia 10 --interacoes 5
+    python -m benchmarks.carga --linhas 200000 --paginas mensal --saida carga.json
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.dados_sinteticos import (AbaSintetica, ClienteSintetico, PlanilhaSintetica, como_valores, como_xlsx,
+                                         gerar_fiscalizacao, gerar_producao)
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+PAGINAS = {
+    'diaria': 'pages/1_Producao_Diaria.py',
+    'mensal': 'pages/2_Producao_Mensal.py',
+    'fiscalizacao': 'pages/3_Fiscalizacao.py',
+}
+
+TIPO_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _memoria_mb():
+    """
+    Memória residente (RSS) do processo em MB. Fora do Linux, usa o pico (ru_maxrss).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def instalar_backend(linhas, seed=0):
+    """
+    Troca o cliente gspread por um `ClienteSintetico` com todas as abas
+    configuradas em utils/bases.py e o retorna.
+    """
+    import utils.bases as bases
+    import utils.fontes_dados as fontes_dados
+
+    planilhas = {}
+    for configuracao, gerar in ((bases.PLANILHAS_MENSAL, gerar_producao), (bases.PLANILHAS_FISCALIZACAO, gerar_fiscalizacao)):
+        for i, (planilha, aba) in enumerate(configuracao.values()):
+            livro = planilhas.setdefault(planilha, PlanilhaSintetica({}))
+            livro.abas[aba or f"Página{len(livro.abas) + 1}"] = AbaSintetica(como_valores(gerar(linhas, seed=seed + i)))
+
+    cliente = ClienteSintetico(planilhas)
+    fontes_dados.obter_cliente = lambda: cliente
+    return cliente
+
+
+def simular_upload(quantidade, linhas, seed=0):
+    """
+    Faz o `file_uploader` devolver `quantidade` planilhas .xlsx sintéticas.
+    Retorna o patch (já iniciado).
+    """
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+    arquivos = [(f"producao_{i + 1}.xlsx", como_xlsx(gerar_producao(linhas, seed=seed + i))) for i in range(quantidade)]
+
+    def file_uploader(self, *args, **kwargs):
+        # Objetos novos a cada rerun: o UploadedFile é um BytesIO, com posição de leitura própria
+        enviados = [
+            UploadedFile(UploadedFileRec(file_id=f"sintetico-{i}", name=nome, type=TIPO_XLSX, data=dados), None)
+            for i, (nome, dados) in enumerate(arquivos)
+        ]
+        return enviados if kwargs.get('accept_multiple_files') else enviados[0]
+
+    patch = mock.patch.object(DeltaGenerator, 'file_uploader', file_uploader)
+    patch.start()
+    return patch
+
+
+def _interagir(at, rng):
+    """
+    Altera um widget escolhido ao acaso entre os exibidos na página. Retorna
+    False se não houver nenhum.
+    """
+    widgets = list(at.multiselect) + list(at.selectbox) + list(at.radio) + list(at.toggle)
+    if not widgets:
+        return False
+    widget = rng.choice(widgets)
+    if widget.type == 'multiselect':
+        widget.set_value(rng.sample(list(widget.options), k=min(len(widget.options), rng.randint(1, 2))))
+    elif widget.type == 'selectbox':
+        widget.select_index(rng.randrange(len(widget.options)))
+    elif widget.type == 'radio':
+        widget.set_value(rng.choice(list(widget.options)))
+    else:
+        widget.set_value(not widget.value)
+    return True
+
+
+def _rerun(at, pagina, tempos, erros, timeout):
+    inicio = time.perf_counter()
+    at.run(timeout=timeout)
+    tempos.append((pagina, time.perf_counter() - inicio))
+    erros.extend(f"{pagina}: {e.message}" for e in at.exception)
+
+
+def sessao(pagina, interacoes, seed, timeout=120):
+    """
+    Uma sessão: abre o dashboard.py, navega até `pagina` e faz `interacoes`
+    interações aleatórias. Retorna (AppTest, [(página, segundos) por rerun], erros).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    tempos, erros = [], []
+    at = AppTest.from_file(str(RAIZ / 'dashboard.py'), default_timeout=timeout)
+    _rerun(at, 'home', tempos, erros, timeout)
+    at.switch_page(PAGINAS[pagina])
+    _rerun(at, pagina, tempos, erros, timeout)
+    for _ in range(interacoes):
+        if not _interagir(at, rng):
+            break
+        _rerun(at, pagina, tempos, erros, timeout)
+    return at, tempos, erros
+
+
+def _percentis(segundos):
+    ms = np.asarray(segundos) * 1000
+    return {
+        'reruns': len(ms),
+        'p50_ms': round(float(np.percentile(ms, 50)), 1),
+        'p90_ms': round(float(np.percentile(ms, 90)), 1),
+        'p99_ms': round(float(np.percentile(ms, 99)), 1),
+        'max_ms': round(float(ms.max()), 1),
+    }
+
+
+def executar(sessoes, concorrencia, interacoes, paginas, linhas, linhas_diaria, arquivos_diaria, seed=0):
+    """
+    Roda o aquecimento e as sessões simultâneas e retorna o resumo das medições.
+    """
+    instalar_backend(linhas, seed)
+    if 'diaria' in paginas:
+        simular_upload(arquivos_diaria, linhas_diaria, seed)
+
+    # Caches frios: uma sessão por página, uma de cada vez
+    aquecimento = {}
+    abertas = []
+    for pagina in paginas:
+        at, tempos, erros = sessao(pagina, 0, seed)
+        abertas.append(at)
+        aquecimento[pagina] = round(tempos[-1][1] * 1000, 1)
+        if erros:
+            raise RuntimeError(f"Erro no aquecimento: {erros[0]}")
+
+    gc.collect()
+    memoria_inicial = _memoria_mb()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        futuros = [executor.submit(sessao, paginas[i % len(paginas)], interacoes, seed + i + 1) for i in range(sessoes)]
+        resultados = [futuro.result() for futuro in futuros]
+    duracao = time.perf_counter() - inicio
+    abertas.extend(at for at, _, _ in resultados)
+    gc.collect()
+    memoria_final = _memoria_mb()
+
+    tempos = [t for _, tempos_sessao, _ in resultados for t in tempos_sessao]
+    erros = [e for _, _, erros_sessao in resultados for e in erros_sessao]
+    por_pagina = {
+        pagina: _percentis([s for p, s in tempos if p == pagina])
+        for pagina in ['home'] + list(paginas)
+        if any(p == pagina for p, _ in tempos)
+    }
+    return {
+        'sessoes': sessoes,
+        'concorrencia': concorrencia,
+        'interacoes': interacoes,
+        'linhas': linhas,
+        'aquecimento_ms': aquecimento,
+        'duracao_s': round(duracao, 2),
+        'vazao_reruns_s': round(len(tempos) / duracao, 2),
+        'latencia': por_pagina | {'total': _percentis([s for _, s in tempos])},
+        'memoria_inicial_mb': round(memoria_inicial, 1),
+        'memoria_final_mb': round(memoria_final, 1),
+        'memoria_por_sessao_mb': round((memoria_final - memoria_inicial) / sessoes, 2),
+        'erros': erros,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessoes', type=int, default=30, help="Quantidade de sessões simuladas")
+    parser.add_argument('--concorrencia', type=int, default=10, help="Sessões executando ao mesmo tempo")
+    parser.add_argument('--interacoes', type=int, default=5, help="Interações aleatórias por sessão")
+    parser.add_argument('--paginas', nargs='+', choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument('--linhas', type=int, default=50_000, help="Linhas de cada aba sintética do Sheets")
+    parser.add_argument('--linhas-diaria', type=int, default=20_000, help="Linhas de cada planilha enviada na Produção Diária")
+    parser.add_argument('--arquivos-diaria', type=int, default=1, help="Planilhas enviadas na Produção Diária")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    # As páginas usam caminhos relativos (imagens, bases); nada é gravado fora da pasta temporária
+    os.chdir(RAIZ)
+    with tempfile.TemporaryDirectory() as pasta:
+        import utils.cache_planilhas as cache_planilhas
+        import utils.repositorio as repositorio
+        cache_planilhas.PASTA_CACHE = Path(pasta) / "planilhas"
+        repositorio.PASTA_REPOSITORIO = Path(pasta) / "repositorio"
+
+        r = executar(args.sessoes, args.concorrencia, args.interacoes, args.paginas, args.linhas,
+                     args.linhas_diaria, args.arquivos_diaria, args.seed)
+
+    print("Aquecimento (primeiro rerun, caches frios): "
+          + ", ".join(f"{pagina} {ms:.0f} ms" for pagina, ms in r['aquecimento_ms'].items()))
+    print(f"\n{r['sessoes']} sessões, {r['concorrencia']} simultâneas, {r['interacoes']} interações cada: "
+          f"{r['duracao_s']} s, {r['vazao_reruns_s']} reruns/s")
+    print(f"\n{'página':<14} {'reruns':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+    for pagina, l in r['latencia'].items():
+        print(f"{pagina:<14} {l['reruns']:>7} {l['p50_ms']:>8} {l['p90_ms']:>8} {l['p99_ms']:>8} {l['max_ms']:>8}")
+    print(f"\nMemória (RSS): {r['memoria_inicial_mb']} MB -> {r['memoria_final_mb']} MB, "
+          f"{r['memoria_por_sessao_mb']} MB por sessão")
+    if r['erros']:
+        print(f"\n{len(r['erros'])} reruns com exceção; a primeira: {r['erros'][0]}")
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump({'data': datetime.now().isoformat(), **r}, f, indent=2, ensure_ascii=False)
+
+    if r['erros']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Geração de bases sintéticas com o mesmo esquema das planilhas do SOC.
+
+Os textos vêm com maiúsculas/minúsculas e espaços misturados, como nas planilhas
+reais, para que a etapa de padronização tenha trabalho de verdade.
+"""
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+SETORES = ['Corte', ' corte ', 'Religação', 'religação  urgente', 'Vistoria', 'Inspeção  BT', 'Recadastro']
+RESULTADOS = ['Produtivo', 'produtivo ', 'Improdutivo', ' IMPRODUTIVO']
+SERVICOS = ['Corte no poste', 'Corte na caixa', 'Religação normal', 'Religação  urgente', 'Vistoria técnica']
+TIPOS_OPERACAO = ['Campo', 'campo', 'Remota', 'Retorno']
+
+STATUS = ['Procedente', 'IMPROCEDENTE', 'improcedente ', 'Não fiscalizado', '']
+ERROS = [''] * 6 + ['Foto ilegível', 'Leitura divergente', 'Selo ausente', 'Endereço incorreto']
+STATUS_PLANO = ['Pendente', 'Realizado', 'realizado', '']
+
+
+def _escolher(rng, opcoes, n):
+    return np.asarray(opcoes, dtype=object)[rng.integers(0, len(opcoes), n)]
+
+
+def gerar_producao(n, equipes=120, seed=0):
+    """
+    Base de produção (Diária/Mensal) com `n` linhas.
+    """
+    rng = np.random.default_rng(seed)
+    codigos_equipe = np.array([f"  mar-{i:03d} " if i % 3 == 0 else f"MAR-{i:03d}" for i in range(equipes)], dtype=object)
+    return pd.DataFrame({
+        'Setor': _escolher(rng, SETORES, n),
+        'Código Equipe': codigos_equipe[rng.integers(0, equipes, n)],
+        'Resultado': _escolher(rng, RESULTADOS, n),
+        'Serviço': _escolher(rng, SERVICOS, n),
+        'Tipo Operação': _escolher(rng, TIPOS_OPERACAO, n),
+        'Nota': rng.integers(10_000_000, 99_999_999, n),
+    })
+
+
+def gerar_fiscalizacao(n, agentes=40, dias=180, seed=0):
+    """
+    Base de fiscalização com `n` linhas, todas as colunas como texto (como vêm do Sheets).
+    """
+    rng = np.random.default_rng(seed)
+    datas = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, dias, n), unit='D')
+    datas = datas.strftime('%d/%m/%Y').to_numpy(dtype=object)
+    datas[rng.random(n) < 0.01] = 'sem data'
+    return pd.DataFrame({
+        'Status': _escolher(rng, STATUS, n),
+        'Erro': _escolher(rng, ERROS, n),
+        'Agente': np.array([f"Agente {i}" for i in range(agentes)], dtype=object)[rng.integers(0, agentes, n)],
+        'Data da analise': datas,
+        'Responsável': _escolher(rng, ['Supervisor A', 'Supervisor B', 'supervisor c'], n),
+        'Status Plano Ação': _escolher(rng, STATUS_PLANO, n),
+    })
+
+
+def como_valores(df):
+    """
+    Converte o DataFrame no formato de `Worksheet.get_all_values()` (cabeçalho + linhas de texto).
+    """
+    return [list(df.columns)] + df.astype(str).to_numpy().tolist()
+
+
+def como_xlsx(df):
+    """
+    Grava o DataFrame como planilha .xlsx (em bytes), no formato dos uploads da Produção Diária.
+    """
+    livro = openpyxl.Workbook(write_only=True)
+    aba = livro.create_sheet()
+    aba.append(list(df.columns))
+    for linha in df.itertuples(index=False, name=None):
+        aba.append(linha)
+    buffer = io.BytesIO()
+    livro.save(buffer)
+    return buffer.getvalue()
+
+
+class AbaSintetica:
+    """
+    Substituto do `gspread.Worksheet` com os métodos usados pelo `SincronizadorPlanilha`.
+    """
+
+    def __init__(self, valores):
+        self.valores = valores
+
+    def get_all_values(self):
+        return self.valores
+
+    def batch_get(self, faixas):
+        # Só entende as faixas que o sincronizador pede: "1:1" e "A{n}:{coluna}"
+        resultado = []
+        for faixa in faixas:
+            if faixa == "1:1":
+                resultado.append(self.valores[:1])
+            else:
+                inicio = int(faixa.split(":")[0][1:])
+                resultado.append(self.valores[inicio - 1:])
+        return resultado
+
+
+class PlanilhaSintetica:
+    """
+    Substituto do `gspread.Spreadsheet`: abas sintéticas por nome (a primeira é a `sheet1`).
+    """
+
+    def __init__(self, abas):
+        self.abas = abas
+
+    @property
+    def sheet1(self):
+        return next(iter(self.abas.values()))
+
+    def worksheet(self, nome):
+        return self.abas[nome]
+
+
+class ClienteSintetico:
+    """
+    Substituto do cliente gspread: abre as planilhas sintéticas pelo nome ou pela URL.
+    """
+
+    def __init__(self, planilhas):
+        self.planilhas = planilhas
+
+    def open(self, nome):
+        return self.planilhas[nome]
+
+    def open_by_url(self, url):
+        return self.planilhas[url]
@@ -0,0 +1,218 @@
+"""
+Tempo e memória de cada etapa do caminho de dados das páginas.
+
+Para cada tamanho de base são geradas uma planilha .xlsx (upload da Produção
+Diária) e os valores de uma aba do Sheets (Produção Mensal e Fiscalização), com
+o esquema real das planilhas. As etapas são medidas separadamente:
+
+- ingestao: leitura da planilha / sincronização da aba, sem padronizar;
+- normalizacao: padronização do texto (e datas, na Fiscalização);
+- indexacao: estruturas montadas uma vez por versão dos dados (cubo, índices);
+- filtro e agregacao: o que cada rerun faz com um filtro aplicado.
+
+O tempo é o melhor de `--repeticoes` execuções; o pico de memória vem de uma
+execução à parte com tracemalloc (que deixa o código mais lento). O resultado
+pode ser salvo em JSON e comparado com o de outro commit:
+
+    python -m benchmarks.desempenho --tamanhos 10000 100000 --saida antes.json
+    python -m benchmarks.desempenho --tamanhos 10000 100000 --comparar antes.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import AbaSintetica, como_valores, como_xlsx, gerar_fiscalizacao, gerar_producao
+from utils.bases import padronizar_producao, preparar_fiscalizacao
+from utils.cache_planilhas import ler_excel_em_blocos
+from utils.cubo import contagem_por, contar, filtrar_cubo, montar_cubo, tabela_contagens
+from utils.fiscalizacao import IndiceDiario, contagens_periodo, filtrar, montar_base
+from utils.indice import IndiceBitmap
+from utils.sincronizacao import SincronizadorPlanilha
+
+# O Excel não comporta mais linhas que isso numa aba
+MAXIMO_LINHAS_EXCEL = 1_048_575
+
+
+def _medir(funcao, preparo=None, repeticoes=3):
+    """
+    Retorna (melhor tempo em segundos, pico de memória em MB) de `funcao`.
+    `preparo`, se houver, gera a entrada de cada execução fora da medição.
+    """
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        entrada = preparo() if preparo is not None else None
+        inicio = time.perf_counter()
+        funcao(entrada)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    entrada = preparo() if preparo is not None else None
+    tracemalloc.start()
+    funcao(entrada)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return melhor, pico / 1024 ** 2
+
+
+def _sincronizar(valores):
+    return SincronizadorPlanilha().sincronizar(AbaSintetica(valores))
+
+
+def etapas_producao(tamanho, limite_excel):
+    """
+    Etapas das páginas de produção: {pagina: {etapa: (funcao, preparo)}}.
+    """
+    bruto = gerar_producao(tamanho)
+    valores = como_valores(bruto)
+    df = padronizar_producao(bruto.copy())
+    cubo = montar_cubo(df)
+    indice = IndiceBitmap(df, ['Setor', 'Código Equipe', 'Resultado'])
+    filtros = {'Setor': [cubo['Setor'].iloc[0]], 'Código Equipe': None, 'Resultado': None}
+
+    def agregar(_):
+        cubo_filtrado = filtrar_cubo(cubo, filtros)
+        contar(cubo_filtrado)
+        contar(cubo_filtrado, 'Resultado', 'PRODUTIVO')
+        contagem_por(cubo_filtrado, 'Setor')
+        tabela_contagens(cubo_filtrado, ['Código Equipe'])
+        tabela_contagens(cubo_filtrado, ['Setor'])
+
+    etapas = {
+        'producao_diaria': {},
+        'producao_mensal': {
+            'ingestao': (lambda _: _sincronizar(valores), None),
+            'normalizacao': (padronizar_producao, lambda: _sincronizar(valores)),
+        },
+        'producao': {
+            'indexacao': (lambda _: (montar_cubo(df), IndiceBitmap(df, ['Setor', 'Código Equipe', 'Resultado'])), None),
+            'filtro': (lambda _: indice.posicoes(filtros), None),
+            'agregacao': (agregar, None),
+        },
+    }
+    if tamanho <= min(limite_excel, MAXIMO_LINHAS_EXCEL):
+        planilha = como_xlsx(bruto)
+        etapas['producao_diaria'] = {
+            'ingestao': (lambda _: ler_excel_em_blocos(planilha, lambda bloco: bloco), None),
+            'normalizacao': (padronizar_producao, lambda: bruto.copy()),
+        }
+    return etapas
+
+
+def etapas_fiscalizacao(tamanho):
+    """
+    Etapas da página de Fiscalização: {pagina: {etapa: (funcao, preparo)}}.
+    """
+    valores = como_valores(gerar_fiscalizacao(tamanho))
+    base = montar_base(preparar_fiscalizacao(_sincronizar(valores)))
+    indice = IndiceDiario(base)
+    inicio, fim = base['Data da analise'].iloc[0], base['Data da analise'].iloc[-1]
+    agente = base['Agente'].iloc[0]
+
+    def filtrar_por_agente(_):
+        return filtrar(base, indice, inicio, fim, agente=agente)
+
+    df_filtrado = filtrar_por_agente(None)
+
+    return {
+        'fiscalizacao': {
+            'ingestao': (lambda _: _sincronizar(valores), None),
+            'normalizacao': (preparar_fiscalizacao, lambda: _sincronizar(valores)),
+            'indexacao': (lambda _: IndiceDiario(montar_base(base)), None),
+            'filtro': (filtrar_por_agente, None),
+            'agregacao': (lambda _: contagens_periodo(base, indice, inicio.date(), fim.date(), filtros_ativos=False), None),
+            'agregacao_filtrada': (lambda _: contagens_periodo(df_filtrado, indice, inicio.date(), fim.date(), filtros_ativos=True), None),
+        },
+    }
+
+
+def medir(tamanho, repeticoes=3, limite_excel=200_000):
+    """
+    Mede todas as etapas para uma base de `tamanho` linhas.
+    """
+    resultados = []
+    for etapas in (etapas_producao(tamanho, limite_excel), etapas_fiscalizacao(tamanho)):
+        for pagina, funcoes in etapas.items():
+            for etapa, (funcao, preparo) in funcoes.items():
+                segundos, pico = _medir(funcao, preparo, repeticoes)
+                resultados.append({
+                    'pagina': pagina,
+                    'etapa': etapa,
+                    'linhas': tamanho,
+                    'segundos': round(segundos, 5),
+                    'pico_mb': round(pico, 2),
+                })
+    return resultados
+
+
+def _commit_atual():
+    try:
+        saida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        return saida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, arquivo_anterior, tolerancia):
+    """
+    Imprime a razão entre os tempos atuais e os de um JSON anterior e retorna
+    as medições que ficaram mais lentas que a tolerância.
+    """
+    with open(arquivo_anterior) as f:
+        anterior = {(r['pagina'], r['etapa'], r['linhas']): r for r in json.load(f)['resultados']}
+
+    regressoes = []
+    print(f"\n{'página':<16} {'etapa':<19} {'linhas':>10} {'antes (s)':>10} {'agora (s)':>10} {'razão':>7}")
+    for r in resultados:
+        antes = anterior.get((r['pagina'], r['etapa'], r['linhas']))
+        if antes is None or not antes['segundos']:
+            continue
+        razao = r['segundos'] / antes['segundos']
+        marca = '  <-- mais lento' if razao > tolerancia else ''
+        print(f"{r['pagina']:<16} {r['etapa']:<19} {r['linhas']:>10} {antes['segundos']:>10.4f} {r['segundos']:>10.4f} {razao:>7.2f}{marca}")
+        if marca:
+            regressoes.append(r)
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--limite-excel', type=int, default=200_000,
+                        help="Maior base gravada como .xlsx (gerar a planilha é lento)")
+    parser.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar os tempos")
+    parser.add_argument('--tolerancia', type=float, default=1.2,
+                        help="Razão de tempo a partir da qual a etapa é apontada como mais lenta")
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'página':<16} {'etapa':<19} {'linhas':>10} {'segundos':>10} {'pico MB':>9}")
+    for tamanho in args.tamanhos:
+        for r in medir(tamanho, args.repeticoes, args.limite_excel):
+            print(f"{r['pagina']:<16} {r['etapa']:<19} {r['linhas']:>10} {r['segundos']:>10.4f} {r['pico_mb']:>9.2f}")
+            resultados.append(r)
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump({
+                'data': datetime.now().isoformat(),
+                'commit': _commit_atual(),
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'resultados': resultados,
+            }, f, indent=2)
+
+    if args.comparar:
+        regressoes = comparar(resultados, args.comparar, args.tolerancia)
+        if regressoes:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
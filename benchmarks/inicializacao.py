@@ -0,0 +1,88 @@
+"""
+Tempo de partida a frio de cada página, do dashboard.py até o fim do pg.run().
+
+Cada página é medida num processo Python novo (sem nada importado), rodando o
+dashboard.py pelo AppTest do Streamlit. São informados:
+
+- o tempo de importar o Streamlit;
+- o tempo da partida: primeiro rerun do dashboard.py, que abre a Home;
+- o tempo do primeiro rerun da página (dashboard.py + página), depois da partida;
+- os módulos pesados carregados na partida e depois de abrir a página.
+
+Sem credenciais do Google as páginas do Sheets exibem o erro de conexão; o
+tempo medido continua sendo o da partida do app.
+
+    python -m benchmarks.inicializacao --repeticoes 3 --saida inicializacao.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+PAGINAS = ['pages/Home.py', 'pages/1_Producao_Diaria.py', 'pages/2_Producao_Mensal.py', 'pages/3_Fiscalizacao.py']
+
+# O próprio Streamlit já importa plotly (sem o express) e PIL
+MODULOS_PESADOS = ['pandas', 'plotly.express', 'gspread', 'google.oauth2', 'openpyxl', 'pyarrow.parquet']
+
+# Executado em um processo novo para cada medição
+_PROCESSO_FILHO = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+importou = time.perf_counter()
+at = AppTest.from_file({dashboard!r}, default_timeout=120)
+at.run()
+partida = time.perf_counter()
+modulos_partida = [m for m in {modulos!r} if m in sys.modules]
+if {pagina!r} != {inicial!r}:
+    at.switch_page({pagina!r})
+    at.run()
+fim = time.perf_counter()
+print(json.dumps({{
+    'import_streamlit_s': importou - inicio,
+    'partida_s': partida - importou,
+    'pagina_s': fim - partida,
+    'modulos_partida': modulos_partida,
+    'modulos': [m for m in {modulos!r} if m in sys.modules],
+}}))
+"""
+
+
+def medir_pagina(pagina):
+    codigo = _PROCESSO_FILHO.format(dashboard=str(RAIZ / 'dashboard.py'), pagina=pagina, inicial=PAGINAS[0], modulos=MODULOS_PESADOS)
+    saida = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--paginas', nargs='+', default=PAGINAS)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'página':<30} {'streamlit (s)':>14} {'partida (s)':>12} {'página (s)':>11}  módulos pesados (partida | página)")
+    for pagina in args.paginas:
+        medicoes = [medir_pagina(pagina) for _ in range(args.repeticoes)]
+        r = {'pagina': pagina}
+        for chave in ('import_streamlit_s', 'partida_s', 'pagina_s'):
+            r[chave] = round(statistics.median(m[chave] for m in medicoes), 3)
+        r['modulos_partida'] = medicoes[-1]['modulos_partida']
+        r['modulos'] = medicoes[-1]['modulos']
+        print(f"{pagina:<30} {r['import_streamlit_s']:>14} {r['partida_s']:>12} {r['pagina_s']:>11}  "
+              f"{', '.join(r['modulos_partida'])} | {', '.join(r['modulos'])}")
+        resultados.append(r)
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump({'data': datetime.now().isoformat(), 'resultados': resultados}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
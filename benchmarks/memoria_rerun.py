@@ -0,0 +1,123 @@
+"""
+Memória alocada por rerun no caminho de filtros/exibição das páginas.
+
+Os dados são preparados uma vez (como nos caches das páginas) e, para cada
+tamanho de base, mede-se com tracemalloc o pico de alocação de um rerun típico.
+Sem filtros o pico deve ficar constante; com filtros ele acompanha
+o tamanho da seleção (e das máscaras booleanas), nunca uma cópia da base inteira.
+
+Na Produção Diária mede-se a leitura das planilhas enviadas num rerun (já em
+cache): o pico não deve depender do tamanho dos arquivos nem da base.
+
+    python -m benchmarks.memoria_rerun --tamanhos 10000 100000 1000000
+"""
+import argparse
+import json
+import tempfile
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from benchmarks.dados_sinteticos import como_xlsx, gerar_fiscalizacao, gerar_producao
+from utils.bases import padronizar_producao, preparar_fiscalizacao
+from utils.cubo import contar, filtrar_cubo, montar_cubo, tabela_contagens
+from utils.fiscalizacao import IndiceDiario, contagens_periodo, filtrar, montar_base
+from utils.indice import IndiceBitmap
+from utils.normalizacao import COLUNAS_PRODUCAO, normalizar_colunas
+from utils.painel_producao import planilhas_em_cache
+
+
+def _pico_kb(funcao):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / 1024
+
+
+def _enviados(tamanho):
+    """
+    Planilha .xlsx sintética como o `file_uploader` a entrega (objeto novo a cada rerun).
+    """
+    from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+    dados = como_xlsx(gerar_producao(tamanho))
+    tipo = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return lambda: [UploadedFile(UploadedFileRec(file_id=f"sintetico-{tamanho}", name="producao.xlsx", type=tipo, data=dados), None)]
+
+
+def medir(tamanho, limite_excel):
+    df = padronizar_producao(gerar_producao(tamanho))
+    cubo = montar_cubo(df)
+    indice = IndiceBitmap(df, ['Setor', 'Código Equipe', 'Resultado'])
+    setor = cubo['Setor'].iloc[0]
+
+    def rerun_producao(filtros):
+        cubo_filtrado = filtrar_cubo(cubo, filtros)
+        contar(cubo_filtrado)
+        contar(cubo_filtrado, 'Resultado', 'PRODUTIVO')
+        tabela_contagens(cubo_filtrado, ['Código Equipe'])
+        tabela_contagens(cubo_filtrado, ['Setor'])
+        indice.posicoes(filtros)
+
+    sem_filtro = {'Setor': None, 'Código Equipe': None, 'Resultado': None}
+    com_filtro = {'Setor': [setor], 'Código Equipe': None, 'Resultado': None}
+
+    base = montar_base(preparar_fiscalizacao(gerar_fiscalizacao(tamanho)))
+    indice_datas = IndiceDiario(base)
+    inicio, fim = base['Data da analise'].iloc[0], base['Data da analise'].iloc[-1]
+
+    def rerun_fiscalizacao():
+        df_filtrado = filtrar(base, indice_datas, inicio, fim)
+        contagens_periodo(df_filtrado, indice_datas, inicio.date(), fim.date(), filtros_ativos=False)
+
+    diaria_kb = None
+    if tamanho <= limite_excel:
+        enviados = _enviados(tamanho)
+        preparar = partial(normalizar_colunas, colunas=COLUNAS_PRODUCAO)
+
+        def rerun_diaria():
+            arquivos = enviados()
+            planilhas_em_cache("|".join(arquivo.file_id for arquivo in arquivos), arquivos, preparar)
+
+        # O primeiro envio converte a planilha; o rerun medido já a encontra em cache
+        rerun_diaria()
+        diaria_kb = round(_pico_kb(rerun_diaria), 1)
+
+    return {
+        'linhas': tamanho,
+        'producao_sem_filtro_kb': round(_pico_kb(lambda: rerun_producao(sem_filtro)), 1),
+        'producao_com_filtro_kb': round(_pico_kb(lambda: rerun_producao(com_filtro)), 1),
+        'fiscalizacao_kb': round(_pico_kb(rerun_fiscalizacao), 1),
+        'diaria_kb': diaria_kb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--limite-excel', type=int, default=200_000,
+                        help="Maior base gravada como .xlsx (gerar a planilha é lento)")
+    parser.add_argument('--saida', help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    # As planilhas convertidas vão para uma pasta temporária, e não para o cache do app
+    with tempfile.TemporaryDirectory() as pasta:
+        import utils.cache_planilhas as cache_planilhas
+        cache_planilhas.PASTA_CACHE = Path(pasta)
+        resultados = [medir(t, args.limite_excel) for t in args.tamanhos]
+
+    print(f"{'linhas':>10} {'prod. s/ filtro':>16} {'prod. c/ filtro':>16} {'fiscalização':>14} {'diária':>10}  (pico KB)")
+    for r in resultados:
+        diaria = '-' if r['diaria_kb'] is None else r['diaria_kb']
+        print(f"{r['linhas']:>10} {r['producao_sem_filtro_kb']:>16} {r['producao_com_filtro_kb']:>16} {r['fiscalizacao_kb']:>14} {diaria:>10}")
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump({'data': datetime.now().isoformat(), 'resultados': resultados}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,63 @@
-import base64
-import pandas as pd
-
-# Nome do arquivo Excel que você quer converter
-# Certifique-se de que este script e a pasta 'base de dados' estejam no mesmo local.
-caminho_do_arquivo = 'base de dados/base.xlsx'
-nome_do_secret = 'EXCEL_BASE64'
-nome_arquivo_saida = 'secret_para_copiar.txt'
-
-try:
-    # Abre o arquivo em modo de leitura de bytes
-    with open(caminho_do_arquivo, "rb") as f:
-        # Codifica o conteúdo do arquivo para Base64
-        base64_string = base64.b64encode(f.read()).decode()
-
-    # Cria a string completa no formato que o Streamlit espera
-    conteudo_para_salvar = f'{nome_do_secret} = "{base64_string}"'
-
-    # Salva a string em um arquivo de texto
-    with open(nome_arquivo_saida, "w") as f_out:
-        f_out.write(conteudo_para_salvar)
-
-    print(f"Conversão bem-sucedida! O secret foi salvo no arquivo '{nome_arquivo_saida}'.")
-    print("\nAbra este arquivo, copie todo o seu conteúdo e cole nos Secrets do seu app no Streamlit Cloud.")
-
-
-except FileNotFoundError:
-    print(f"Erro: O arquivo '{caminho_do_arquivo}' não foi encontrado. Verifique o caminho.")
-except Exception as e:
-    print(f"Ocorreu um erro: {e}")
-
+"""
+Guarda uma planilha .xlsx como nova versão de uma base do repositório local
+(utils/repositorio.py), em Parquet comprimido com manifesto de versões.
+
+Substitui a antiga conversão da planilha para um secret em Base64, que aumentava
+o arquivo em 33% e precisava ser decodificado a cada leitura.
+
+    python converter_base.py                                  # base de dados/base.xlsx -> producao_mensal
+    python converter_base.py planilha.xlsx --nome fiscalizacao
+    python converter_base.py --listar producao_mensal
+    python converter_base.py janeiro.xlsx --mes 2025-01         # só fecha (ou refaz) o mês no histórico mensal
+"""
+import argparse
+from pathlib import Path
+
+from utils.bases import padronizar_producao, preparar_fiscalizacao
+from utils.cache_planilhas import ler_excel_em_blocos
+from utils.historico import fechar_mes_da_base
+from utils.repositorio import PASTA_REPOSITORIO, ingerir_planilha, versoes
+
+# Preparação aplicada a cada base conhecida (as demais são guardadas como lidas)
+PREPARACOES = {
+    'producao_mensal': padronizar_producao,
+    'fiscalizacao': preparar_fiscalizacao,
+}
+
+
+def listar(nome):
+    lista = versoes(nome)
+    if not lista:
+        print(f"A base '{nome}' não existe em '{PASTA_REPOSITORIO}'.")
+    for r in lista:
+        print(f"v{r['versao']:<4} {r['criado_em']}  {r['linhas']:>8} linhas  {r['bytes'] / 1024:>8.1f} KB  {r['origem']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('arquivo', nargs='?', default='base de dados/base.xlsx', help="Planilha .xlsx a guardar")
+    parser.add_argument('--nome', default='producao_mensal', help="Nome da base no repositório")
+    parser.add_argument('--listar', metavar='NOME', help="Só lista as versões guardadas da base")
+    parser.add_argument('--mes', metavar='AAAA-MM', help="Em vez de guardar a planilha, fecha o mês no histórico mensal da produção com as contagens dela")
+    args = parser.parse_args()
+
+    if args.listar:
+        listar(args.listar)
+        return
+
+    try:
+        if args.mes:
+            # Meses passados não viram versões da base atual: só as contagens são guardadas
+            df = ler_excel_em_blocos(Path(args.arquivo).read_bytes(), padronizar_producao)
+            versao_historico = fechar_mes_da_base(df, args.mes, substituir=True)
+            print(f"Mês {args.mes} fechado no histórico mensal (versão {versao_historico}, {len(df)} linhas na planilha).")
+            return
+        versao, df = ingerir_planilha(args.nome, args.arquivo, preparar=PREPARACOES.get(args.nome, lambda df: df))
+    except FileNotFoundError:
+        print(f"Erro: O arquivo '{args.arquivo}' não foi encontrado. Verifique o caminho.")
+        return
+    print(f"Base '{args.nome}' guardada na versão {versao} ({len(df)} linhas) em '{PASTA_REPOSITORIO / args.nome}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import streamlit as st
+from utils.fontes_dados import iniciar_atualizador
 
 st.set_page_config(
     page_title="Parcial SOC - Maricá",
@@ -6,6 +7,19 @@ st.set_page_config(
     layout="wide"
 )
 
+def registrar_bases():
+    """
+    Registra as bases do Google Sheets. Roda dentro da thread de atualização:
+    utils.bases puxa o pandas, que não é necessário para abrir a Home.
+    """
+    from utils.bases import fonte_fiscalizacao, fonte_producao_mensal
+    fonte_producao_mensal()
+    fonte_fiscalizacao()
+
+# Inicia a atualização em segundo plano, para que as páginas encontrem os dados
+# já carregados.
+iniciar_atualizador(registrar_bases)
+
 page1 = st.Page("pages/Home.py")
 page2 = st.Page("pages/1_Producao_Diaria.py")
 page3 = st.Page("pages/2_Producao_Mensal.py")
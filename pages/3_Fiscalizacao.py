@@ -1,11 +1,14 @@
 # Importando as bibliotecas necessárias
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from datetime import date, datetime # Adicionado datetime
-from PIL import Image
-import gspread
-from google.oauth2.service_account import Credentials
+from datetime import datetime # Adicionado datetime
+from utils.bases import fonte_fiscalizacao
+from utils.esquema import linhas_com_problema, resumir
+from utils.fiscalizacao import COLUNAS_ESSENCIAIS, FREQUENCIAS, base_em_cache, contagens_periodo, evolucao, filtrar, relatorio_em_cache
+from utils.fontes_dados import exibir_status_atualizacao
+from utils.graficos import figura_barras, figura_pizza, pares
+from utils.instrumentacao import iniciar_medicao, medir_fragmento
+from utils.tabela import exibir_tabela_paginada
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -14,70 +17,69 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Carregamento e Limpeza dos Dados ---
-@st.cache_data
-def carregar_dados_de_gsheets(url_planilha):
+# Tempos de cada etapa do rerun (só é exibido com ?debug=1)
+medidor = iniciar_medicao("Fiscalização")
+
+# --- Carregamento dos Dados ---
+def carregar_dados_de_gsheets(fonte):
     """
-    Carrega os dados brutos da planilha do Google Sheets, limpa os nomes das colunas
-    e garante que os nomes sejam únicos.
+    Retorna o snapshot mais recente da planilha (DataFrame, versão). A leitura e a
+    limpeza dos dados (textos padronizados e data convertida) são feitas em
+    segundo plano pela camada de dados compartilhada.
     """
     try:
-        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scopes)
-        client = gspread.authorize(creds)
-        sheet = client.open_by_url(url_planilha).sheet1
-        all_values = sheet.get_all_values()
+        df, versao = fonte.obter_snapshot()
         
-        if not all_values:
+        if df.columns.empty:
             st.error("A planilha parece estar vazia.")
             return None
-        
-        df = pd.DataFrame(all_values[1:], columns=all_values[0])
-        df.columns = [col.strip() for col in df.columns]
-
-        cols, counts = [], {}
-        for col in df.columns:
-            if col in counts:
-                counts[col] += 1
-                cols.append(f"{col}_{counts[col]}")
-            else:
-                counts[col] = 0
-                cols.append(col)
-        df.columns = cols
-        return df
+        return df, versao
     except Exception as e:
         st.error(f"Ocorreu um erro ao carregar os dados do Google Sheets: {e}")
         return None
 
+# --- Gráfico de Evolução ---
+@st.fragment
+def exibir_evolucao(df_filtrado, indice_datas, data_inicio, data_fim, filtros_ativos, alto_contraste, medidor):
+    """
+    Fiscalizações por dia/semana/mês. É um fragmento: trocar a granularidade
+    reexecuta apenas este gráfico, e não a página inteira.
+    """
+    granularidade = st.radio("Agrupar por", list(FREQUENCIAS), horizontal=True, key='granularidade_evolucao')
+    with medir_fragmento(medidor, 'Evolução') as medidor:
+        fiscalizacoes_periodo = evolucao(df_filtrado, indice_datas, data_inicio, data_fim, FREQUENCIAS[granularidade], filtros_ativos)
+        medidor.marcar('agregacao')
+        periodos, quantidades = pares(fiscalizacoes_periodo)
+        fig_evolucao = figura_barras(periodos, quantidades, f"Fiscalizações por {granularidade}", 'Período', 'Quantidade',
+                                     texto_fora=False, alto_contraste=alto_contraste)
+        medidor.marcar('figuras', em_cache=True)
+        st.plotly_chart(fig_evolucao, use_container_width=True)
+
 # --- Interface Principal ---
 st.title("🔍 Dashboard Fiscalização")
 
-URL_DA_PLANILHA = "https://docs.google.com/spreadsheets/d/1zI6BA_hPSMRRFj1u33Ot3xqPYBrSrnhqv_pSSxBRS6Q/edit?usp=sharing"
-df_raw = carregar_dados_de_gsheets(URL_DA_PLANILHA)
+fonte = fonte_fiscalizacao()
+dados = carregar_dados_de_gsheets(fonte)
+exibir_status_atualizacao(fonte)
 
-if df_raw is not None:
+if dados is not None:
     # --- 1. PREPARAÇÃO CENTRALIZADA DOS DADOS ---
-    df_prepared = df_raw.copy()
+    df_raw, versao_dados = dados
+    medidor.marcar('ingestao', linhas=len(df_raw), em_cache=True)
     
-    colunas_essenciais = ['Status', 'Erro', 'Agente', 'Data da analise', 'Responsável', 'Status Plano Ação']
-    for col in colunas_essenciais:
-        if col not in df_prepared.columns:
+    for col in COLUNAS_ESSENCIAIS:
+        if col not in df_raw.columns:
             st.error(f"Erro Crítico: A coluna '{col}' não foi encontrada na sua planilha.")
             st.stop()
 
-    # Limpeza e padronização das colunas de texto
-    for col in ['Status', 'Erro', 'Agente', 'Responsável', 'Status Plano Ação']:
-        df_prepared[col] = df_prepared[col].astype(str).str.strip().str.upper()
-    
-    # **NOVO: Conversão da coluna de data**
-    # Converte a coluna para datetime, tratando erros (datas inválidas se tornarão NaT)
-    df_prepared['Data da analise'] = pd.to_datetime(df_prepared['Data da analise'], errors='coerce', dayfirst=True)
-    
-    # Remove linhas onde a data não pôde ser convertida
-    df_prepared.dropna(subset=['Data da analise'], inplace=True)
-
-    # Cria a base de dados principal, contendo apenas as linhas que foram de facto fiscalizadas.
-    df_base = df_prepared[df_prepared['Status'].isin(['PROCEDENTE', 'IMPROCEDENTE'])].copy()
+    # Base principal: apenas as linhas de facto fiscalizadas e com data válida,
+    # ordenada por data, com o índice diário de contagens. É montada uma vez por
+    # versão dos dados e compartilhada entre as sessões.
+    df_base, indice_datas = base_em_cache(df_raw, versao_dados)
+    medidor.marcar('indexacao', linhas=len(df_base), em_cache=True)
+    if indice_datas.vazio:
+        st.warning("Nenhuma fiscalização com data válida encontrada na planilha.")
+        st.stop()
 
     # --- 2. BARRA LATERAL E FILTROS ---
     st.sidebar.header("Filtros")
@@ -85,8 +87,8 @@ if df_raw is not None:
     # **NOVO: Filtro de Data**
     st.sidebar.subheader("Período da Análise")
     # Define as datas mínima e máxima com base nos dados disponíveis
-    data_min = df_base['Data da analise'].min().date()
-    data_max = df_base['Data da analise'].max().date()
+    data_min = pd.Timestamp(indice_datas.dias[0]).date()
+    data_max = pd.Timestamp(indice_datas.dias[-1]).date()
 
     data_inicio = st.sidebar.date_input('Data de Início', data_min, min_value=data_min, max_value=data_max, format="DD/MM/YYYY")
     data_fim = st.sidebar.date_input('Data de Fim', data_max, min_value=data_min, max_value=data_max, format="DD/MM/YYYY")
@@ -104,21 +106,15 @@ if df_raw is not None:
     # --- NOVO: Botão para formatação de alto contraste ---
     st.sidebar.subheader("Opções de Visualização")
     alto_contraste = st.sidebar.toggle("Formatação para Modo Claro", help="Ative para melhorar o contraste dos textos dos gráficos no tema claro.")
+    medidor.marcar('render')
 
 
-    # --- 3. APLICAÇÃO SEQUENCIAL DOS FILTROS ---
-    df_filtrado = df_base.copy()
-
-    # **NOVO: Aplicação do filtro de data**
-    df_filtrado = df_filtrado[(df_filtrado['Data da analise'] >= data_inicio_dt) & (df_filtrado['Data da analise'] <= data_fim_dt)]
-
-    # Filtros Categóricos
-    if agente_selecionado != 'TODOS':
-        df_filtrado = df_filtrado[df_filtrado['Agente'] == agente_selecionado]
-    if status_selecionado != 'TODOS':
-        df_filtrado = df_filtrado[df_filtrado['Status'] == status_selecionado]
-    if responsavel_selecionado != 'TODOS':
-        df_filtrado = df_filtrado[df_filtrado['Responsável'] == responsavel_selecionado]
+    # --- 3. APLICAÇÃO DOS FILTROS ---
+    # O período é uma fatia da base ordenada (busca binária); os filtros
+    # categóricos viram uma única máscara sobre essa fatia
+    df_filtrado = filtrar(df_base, indice_datas, data_inicio_dt, data_fim_dt, agente_selecionado, status_selecionado, responsavel_selecionado)
+    filtros_ativos = any(valor != 'TODOS' for valor in (agente_selecionado, status_selecionado, responsavel_selecionado))
+    medidor.marcar('filtro', linhas=len(df_filtrado))
 
     # --- 4. KPIs E GRÁFICOS (usando o df_filtrado como fonte única) ---
     st.markdown(f"### Resumo do Período ({data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')})")
@@ -126,47 +122,41 @@ if df_raw is not None:
     if df_filtrado.empty:
         st.warning("Nenhum dado encontrado para os filtros selecionados. Por favor, ajuste os filtros e o período.")
     else:
-        total_fiscalizado = len(df_filtrado)
-        df_com_erros = df_filtrado[df_filtrado['Erro'] != '']
-        total_erros = len(df_com_erros)
+        # Sem filtros categóricos, as contagens saem das somas acumuladas por dia
+        contagens = contagens_periodo(df_filtrado, indice_datas, data_inicio, data_fim, filtros_ativos)
+        total_fiscalizado = contagens['total']
+        total_erros = int(contagens['Erro'].sum())
         percentual_erro = (total_erros / total_fiscalizado * 100) if total_fiscalizado > 0 else 0
+        medidor.marcar('agregacao')
 
         kpi1, kpi2, kpi3 = st.columns(3)
         kpi1.metric("Total Fiscalizado", total_fiscalizado)
         kpi2.metric("Total de Erros", total_erros)
         kpi3.metric("Percentual de Erro", f"{percentual_erro:.2f}%")
+        medidor.marcar('render')
 
         st.markdown("---")
         col1, col2 = st.columns(2)
 
         with col1:
             st.subheader("Status das Fiscalizações")
-            status_counts = df_filtrado['Status'].value_counts()
-            fig_donut = px.pie(status_counts, values=status_counts.values, names=status_counts.index, 
-                                 title="Proporção Procedente vs. Improcedente", hole=0.4,
-                                 color=status_counts.index, color_discrete_map={'PROCEDENTE':'royalblue', 'IMPROCEDENTE':'darkorange'})
-            fig_donut.update_traces(textinfo='percent+label')
+            status, quantidades = pares(contagens['Status'])
+            fig_donut = figura_pizza(status, quantidades, "Proporção Procedente vs. Improcedente", buraco=0.4,
+                                     cores={'PROCEDENTE':'royalblue', 'IMPROCEDENTE':'darkorange'})
+            medidor.marcar('figuras', em_cache=True)
             st.plotly_chart(fig_donut, use_container_width=True)
+            medidor.marcar('render')
 
         with col2:
             st.subheader("Tipos de Erro Encontrados")
-            if not df_com_erros.empty:
-                erros_counts = df_com_erros['Erro'].value_counts()
-                fig_bar = px.bar(erros_counts, x=erros_counts.index, y=erros_counts.values,
-                                   title="Quantidade por Tipo de Erro", text=erros_counts.values,
-                                   labels={'x': 'Tipo de Erro', 'y': 'Quantidade'})
-                
-                fig_bar.update_layout(showlegend=False, yaxis_range=[0, erros_counts.values.max() * 1.15])
-                
-                # Aplica a formatação condicionalmente
-                if alto_contraste:
-                    fig_bar.update_layout(
-                        xaxis={'title_font':{'weight':'bold', 'color':'black'}, 'tickfont':{'weight':'bold', 'color':'black'}},
-                        yaxis={'title_font':{'weight':'bold', 'color':'black'}, 'tickfont':{'weight':'bold', 'color':'black'}}
-                    )
-                
-                fig_bar.update_traces(textposition='outside')
+            erros_counts = contagens['Erro']
+            if not erros_counts.empty:
+                tipos, quantidades = pares(erros_counts)
+                fig_bar = figura_barras(tipos, quantidades, "Quantidade por Tipo de Erro", 'Tipo de Erro', 'Quantidade',
+                                        alto_contraste=alto_contraste)
+                medidor.marcar('figuras', em_cache=True)
                 st.plotly_chart(fig_bar, use_container_width=True)
+                medidor.marcar('render')
             else:
                 st.info("Nenhum erro encontrado no período selecionado.")
 
@@ -174,60 +164,52 @@ if df_raw is not None:
         
         with col3:
             st.subheader("Pendências Plano de Ação")
-            df_plano_acao = df_filtrado[df_filtrado['Status Plano Ação'].isin(['PENDENTE', 'REALIZADO'])]
-            if not df_plano_acao.empty:
-                status_acao = df_plano_acao['Status Plano Ação'].value_counts()
-                fig_bar2 = px.bar(status_acao, x=status_acao.index, y=status_acao.values,
-                                    title="Pendências por Status do Plano de Ação", text=status_acao.values,
-                                    labels={'x': 'Status Plano de Ação', 'y': 'Quantidade'},
-                                    color=status_acao.index, color_discrete_map={'REALIZADO':'#90ee90', 'PENDENTE':'#f08080'})
-                
-                fig_bar2.update_layout(showlegend=False, yaxis_range=[0, status_acao.values.max() * 1.15 if not status_acao.empty else 1])
-                
-                # Aplica a formatação condicionalmente
-                if alto_contraste:
-                    fig_bar2.update_layout(
-                        xaxis={'title_font':{'weight':'bold', 'color':'black'}, 'tickfont':{'weight':'bold', 'color':'black'}},
-                        yaxis={'title_font':{'weight':'bold', 'color':'black'}, 'tickfont':{'weight':'bold', 'color':'black'}}
-                    )
-
-                fig_bar2.update_traces(textposition='outside')
+            status_acao = contagens['Status Plano Ação']
+            if not status_acao.empty:
+                situacoes, quantidades = pares(status_acao)
+                fig_bar2 = figura_barras(situacoes, quantidades, "Pendências por Status do Plano de Ação", 'Status Plano de Ação', 'Quantidade',
+                                         cores={'REALIZADO':'#90ee90', 'PENDENTE':'#f08080'}, alto_contraste=alto_contraste)
+                medidor.marcar('figuras', em_cache=True)
                 st.plotly_chart(fig_bar2, use_container_width=True)
+                medidor.marcar('render')
             else:
                 st.info("Nenhuma pendência de plano de ação para os filtros selecionados.")
 
         with col4:
             st.subheader("Ranking de Improcedentes por Agente")
-            df_improcedentes = df_filtrado[df_filtrado['Status'] == 'IMPROCEDENTE']
-            if not df_improcedentes.empty:
-                ranking_agentes = df_improcedentes['Agente'].value_counts().sort_values(ascending=False)
-                fig_ranking = px.bar(ranking_agentes, x=ranking_agentes.values, y=ranking_agentes.index,
-                                       orientation='h', title="Top Agentes com Improcedentes",
-                                       text=ranking_agentes.values, labels={'x': 'Quantidade de Improcedentes', 'y': 'Agente'})
-                
-                # AJUSTE: A ordenação agora é aplicada sempre, fora do bloco condicional.
-                fig_ranking.update_layout(
-                    showlegend=False, 
-                    xaxis_range=[0, ranking_agentes.values.max() * 1.15],
-                    yaxis={'categoryorder':'total ascending'}
-                )
-                
-                # Aplica a formatação de cores e negrito condicionalmente
-                if alto_contraste:
-                    fig_ranking.update_layout(
-                        yaxis={'title_font':{'weight':'bold', 'color':'black'}, 'tickfont':{'weight':'bold', 'color':'black'}},
-                        xaxis={'title_font':{'weight':'bold', 'color':'black'}, 'tickfont':{'weight':'bold', 'color':'black'}}
-                    )
-                
-                fig_ranking.update_traces(textposition='outside')
+            ranking_agentes = contagens['Agente']
+            if not ranking_agentes.empty:
+                # Barras horizontais, da maior para a menor
+                agentes, quantidades = pares(ranking_agentes)
+                fig_ranking = figura_barras(agentes, quantidades, "Top Agentes com Improcedentes", 'Agente', 'Quantidade de Improcedentes',
+                                            horizontal=True, alto_contraste=alto_contraste)
+                medidor.marcar('figuras', em_cache=True)
                 st.plotly_chart(fig_ranking, use_container_width=True)
+                medidor.marcar('render')
             else:
                 st.info("Nenhum erro encontrado para gerar o ranking.")
 
+        st.subheader("Evolução das Fiscalizações")
+        exibir_evolucao(df_filtrado, indice_datas, data_inicio, data_fim, filtros_ativos, alto_contraste, medidor)
+
         with st.expander("Ver dados detalhados da fiscalização"):
-            # Formata a coluna de data para exibição no dataframe
-            df_display = df_filtrado.copy()
-            df_display['Data da analise'] = df_display['Data da analise'].dt.strftime('%d/%m/%Y')
-            st.dataframe(df_display)
+            # A data é formatada pelo próprio componente, sem copiar o dataframe
+            # Só a página visível da tabela é enviada ao navegador
+            chave_tabela = (versao_dados, data_inicio_dt, data_fim_dt, agente_selecionado, status_selecionado, responsavel_selecionado)
+            exibir_tabela_paginada(df_filtrado, chave_tabela, 'tabela_fiscalizacao', column_config={
+                'Data da analise': st.column_config.DateColumn(format="DD/MM/YYYY")
+            })
+
+    # --- 5. QUALIDADE DOS DADOS ---
+    # Linhas da planilha fora do esquema (status desconhecido, data inválida, ...)
+    relatorio = relatorio_em_cache(df_raw, versao_dados)
+    if not relatorio.empty:
+        with st.expander(f"⚠️ Qualidade dos dados: {linhas_com_problema(relatorio)} linhas fora do esquema"):
+            st.dataframe(resumir(relatorio), hide_index=True)
+            st.caption("Primeiras linhas com problema (número da linha na planilha):")
+            st.dataframe(relatorio.head(500), hide_index=True)
+
+    medidor.marcar('render')
+    medidor.finalizar()
 else:
     st.warning("Aguardando dados da planilha... Verifique a URL e as configurações de partilha.")
\ No newline at end of file
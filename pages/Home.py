@@ -1,7 +1,7 @@
 import streamlit as st
 from datetime import datetime
 import pytz
-from PIL import Image
+from utils.imagens import exibir_banner
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -9,8 +9,8 @@ st.set_page_config(
     page_icon="📊",
     layout="wide"
 )
-image = Image.open("imagens/ceneged_cover.jpeg")
-st.image(image, use_container_width =True)
+# O banner é redimensionado e codificado uma única vez por processo
+exibir_banner()
 
 col1, col2, col3 = st.columns(3)
 
@@ -0,0 +1,64 @@
+"""
+Lê as bases do Google Sheets e as publica em memória compartilhada
+(utils/compartilhado.py) para os processos do app.
+
+Rode um publicador por máquina e inicie os processos do Streamlit com
+SOC_DADOS_COMPARTILHADOS=1: eles deixam de ler o Sheets e mapeiam as bases
+publicadas, sem guardar cada um a sua cópia.
+
+Como o atualizador em segundo plano do app, o publicador fecha o mês anterior
+no histórico mensal da produção (utils/historico.py) a cada versão nova.
+
+    python publicar_bases.py                  # relê as bases a cada SOC_INTERVALO_ATUALIZACAO segundos
+
+Entre uma passada e outra, os pedidos do botão "Atualizar dados" das páginas
+são atendidos em até um segundo, com uma releitura completa da base pedida.
+    python publicar_bases.py --uma-vez
+"""
+import argparse
+import time
+
+from utils.bases import fonte_fiscalizacao, fonte_producao_mensal
+from utils.compartilhado import PASTA_COMPARTILHADA, pedidos_atualizacao, publicar
+from utils.fontes_dados import INTERVALO_ATUALIZACAO, obter_cliente
+
+
+def publicar_fontes(fontes, cliente):
+    for fonte in fontes:
+        fonte.atualizar(cliente)
+        if fonte.snapshot is None:
+            print(f"{fonte.nome}: não foi possível ler a planilha ({fonte.ultimo_erro}).")
+            continue
+        df, hash_atual = fonte.snapshot
+        versao = publicar(fonte.nome, df, fonte.lido_em, hash_atual=hash_atual)
+        if fonte.ultimo_erro is not None:
+            print(f"{fonte.nome}: falha na atualização ({fonte.ultimo_erro}); mantida a versão {versao}.")
+        else:
+            print(f"{fonte.nome}: versão {versao} ({len(df)} linhas) em '{PASTA_COMPARTILHADA}'.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--uma-vez', action='store_true', help="Publica uma vez e termina")
+    parser.add_argument('--intervalo', type=int, default=INTERVALO_ATUALIZACAO, help="Segundos entre as atualizações")
+    args = parser.parse_args()
+
+    fontes = [fonte_producao_mensal(), fonte_fiscalizacao()]
+    cliente = obter_cliente()
+    while True:
+        publicar_fontes(fontes, cliente)
+        if args.uma_vez:
+            return
+        # Espera o intervalo, mas atende antes um pedido vindo das páginas
+        fim = time.monotonic() + args.intervalo
+        pedidos = []
+        while not pedidos and time.monotonic() < fim:
+            time.sleep(1)
+            pedidos = pedidos_atualizacao()
+        for fonte in fontes:
+            if fonte.nome in pedidos:
+                fonte.invalidar()
+
+
+if __name__ == '__main__':
+    main()
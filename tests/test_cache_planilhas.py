@@ -0,0 +1,76 @@
+"""
+Leitura das planilhas .xlsx enviadas: em blocos e várias juntas (`carregar_varios_excel`).
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.cache_planilhas as cache_planilhas
+from benchmarks.dados_sinteticos import como_xlsx, gerar_producao
+from utils.bases import padronizar_producao
+
+
+class Enviado(io.BytesIO):
+    """
+    Arquivo enviado pelo `file_uploader` (só o que a leitura usa).
+    """
+    def __init__(self, nome, dados):
+        super().__init__(dados)
+        self.name = nome
+
+
+@pytest.fixture(autouse=True)
+def pasta_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_planilhas, "PASTA_CACHE", tmp_path)
+
+
+def test_planilhas_com_as_mesmas_colunas_mantem_as_categorias():
+    arquivos = [Enviado(f"dia{i}.xlsx", como_xlsx(gerar_producao(50, seed=i))) for i in range(2)]
+    df = cache_planilhas.carregar_varios_excel(arquivos, padronizar_producao, max_processos=1)
+    assert len(df) == 100
+    assert isinstance(df['Setor'].dtype, pd.CategoricalDtype)
+    assert df['Arquivo'].value_counts().to_dict() == {'dia0.xlsx': 50, 'dia1.xlsx': 50}
+
+
+def test_coluna_ausente_numa_das_planilhas():
+    completa = gerar_producao(50, seed=0)
+    sem_setor = gerar_producao(30, seed=1).drop(columns=['Setor'])
+    arquivos = [Enviado("completa.xlsx", como_xlsx(completa)), Enviado("sem_setor.xlsx", como_xlsx(sem_setor))]
+    df = cache_planilhas.carregar_varios_excel(arquivos, padronizar_producao, max_processos=1)
+    assert len(df) == 80
+    assert df['Setor'].iloc[:50].notna().all()
+    assert df['Setor'].iloc[50:].isna().all()
+    # As colunas presentes nas duas planilhas continuam categóricas
+    assert isinstance(df['Resultado'].dtype, pd.CategoricalDtype)
+
+
+def test_leitura_em_blocos_igual_ao_read_excel():
+    df = gerar_producao(40, seed=3)
+    # Códigos numéricos com células vazias: o pandas os lê como float (101.0)
+    codigos = np.array([101, 102, 103], dtype=object)[np.arange(40) % 3]
+    codigos[[2, 17, 33]] = None
+    df['Código Equipe'] = codigos
+    dados = como_xlsx(df)
+
+    em_blocos = cache_planilhas.ler_excel_em_blocos(dados, padronizar_producao, tamanho_bloco=7)
+    esperado = padronizar_producao(pd.read_excel(io.BytesIO(dados)))
+
+    pd.testing.assert_frame_equal(em_blocos.astype(object), esperado.astype(object))
+    assert sorted(em_blocos['Código Equipe'].cat.categories) == ['101', '102', '103']
+
+
+def test_limpeza_do_cache_nao_apaga_os_arquivos_do_lote(tmp_path, monkeypatch):
+    # Cache sem espaço: só os arquivos do lote em leitura podem ficar
+    monkeypatch.setenv("SOC_CACHE_MAX_MB", "0")
+    monkeypatch.setattr(cache_planilhas, "MAX_CACHE_MB", 0)
+    antigo = tmp_path / "antigo-v0.parquet"
+    antigo.write_bytes(b"0" * 1024)
+
+    arquivos = [Enviado(f"dia{i}.xlsx", como_xlsx(gerar_producao(30, seed=i))) for i in range(3)]
+    df = cache_planilhas.carregar_varios_excel(arquivos, padronizar_producao, max_processos=3)
+
+    assert len(df) == 90
+    assert not antigo.exists()
+    assert sorted(tmp_path.glob("*.parquet")) == sorted(cache_planilhas._caminho_cache(a.getvalue(), None) for a in arquivos)
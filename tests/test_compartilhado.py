@@ -0,0 +1,77 @@
+"""
+Bases compartilhadas: publicar e mapear devolve os mesmos dados, sem cópia, com
+a versão e o hash do ponteiro.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.compartilhado as compartilhado
+from benchmarks.dados_sinteticos import gerar_fiscalizacao, gerar_producao
+from utils.bases import padronizar_producao, preparar_fiscalizacao
+from utils.repositorio import hash_dados
+
+
+@pytest.fixture(autouse=True)
+def pasta_compartilhada(tmp_path, monkeypatch):
+    monkeypatch.setattr(compartilhado, "PASTA_COMPARTILHADA", tmp_path)
+    monkeypatch.setattr(compartilhado, "_mapeados", {})
+    return tmp_path
+
+
+@pytest.fixture
+def fiscalizacao():
+    # Categorias, datas com NaT e o indicador booleano 'Com Erro'
+    return preparar_fiscalizacao(gerar_fiscalizacao(500, seed=8))
+
+
+@pytest.mark.parametrize("gerar", [
+    lambda: preparar_fiscalizacao(gerar_fiscalizacao(500, seed=8)),
+    lambda: padronizar_producao(gerar_producao(500, seed=8)),
+])
+def test_mapear_devolve_o_que_foi_publicado(gerar):
+    df = gerar()
+    assert compartilhado.publicar("base", df, horario=123.0) == 1
+
+    (mapeado, versao), horario = compartilhado.obter("base")
+    pd.testing.assert_frame_equal(mapeado, df)
+    assert versao == hash_dados(df) == hash_dados(mapeado)
+    assert horario == 123.0
+    assert compartilhado.ler_ponteiro("base")["linhas"] == len(df)
+
+
+def test_colunas_apontam_para_o_arquivo(fiscalizacao):
+    compartilhado.publicar("fiscalizacao", fiscalizacao)
+    (mapeado, _), _ = compartilhado.obter("fiscalizacao")
+    for col in ['Data da analise', 'Com Erro']:
+        assert not mapeado[col].to_numpy().flags.owndata, col
+    assert not mapeado['Status'].cat.codes.to_numpy().flags.owndata
+
+
+def test_mesmo_conteudo_so_atualiza_o_horario(fiscalizacao):
+    compartilhado.publicar("fiscalizacao", fiscalizacao, horario=1.0)
+    (primeiro, _), _ = compartilhado.obter("fiscalizacao")
+
+    assert compartilhado.publicar("fiscalizacao", fiscalizacao.copy(), horario=2.0) == 1
+    (mapeado, _), horario = compartilhado.obter("fiscalizacao")
+    # O arquivo não mudou: o DataFrame não é mapeado de novo
+    assert mapeado is primeiro and horario == 2.0
+
+
+def test_versoes_novas_e_arquivos_antigos_apagados(fiscalizacao, pasta_compartilhada):
+    for n in (100, 200, 300):
+        compartilhado.publicar("fiscalizacao", fiscalizacao.iloc[:n])
+    ponteiro = compartilhado.ler_ponteiro("fiscalizacao")
+    assert ponteiro["versao"] == 3 and ponteiro["hash"] == hash_dados(fiscalizacao.iloc[:300])
+    # O atual e um anterior (que outro processo pode estar abrindo)
+    assert sorted(p.name for p in pasta_compartilhada.glob("*.arrow")) == ["fiscalizacao-000002.arrow", "fiscalizacao-000003.arrow"]
+    (mapeado, _), _ = compartilhado.obter("fiscalizacao")
+    pd.testing.assert_frame_equal(mapeado, fiscalizacao.iloc[:300])
+
+
+def test_pedidos_de_atualizacao_sao_consumidos():
+    assert compartilhado.obter("fiscalizacao") is None
+    compartilhado.pedir_atualizacao("fiscalizacao")
+    compartilhado.pedir_atualizacao("fiscalizacao")
+    assert compartilhado.pedidos_atualizacao() == ["fiscalizacao"]
+    assert compartilhado.pedidos_atualizacao() == []
@@ -0,0 +1,54 @@
+"""
+Cubo de contagens comparado com `pivot_table` / `value_counts` sobre a base.
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.dados_sinteticos import gerar_producao
+from utils.bases import padronizar_producao
+from utils.cubo import contagem_por, contar, filtrar_cubo, montar_cubo, tabela_contagens, valores
+
+
+@pytest.fixture(scope="module")
+def base():
+    df = gerar_producao(3000, equipes=40, seed=5)
+    # Linhas sem setor também entram nos totais
+    df.loc[::97, 'Setor'] = None
+    df = padronizar_producao(df)
+    return df, montar_cubo(df)
+
+
+FILTROS = [
+    {},
+    {'Setor': None, 'Código Equipe': None, 'Resultado': ['PRODUTIVO']},
+    {'Setor': ['CORTE', 'VISTORIA'], 'Código Equipe': None, 'Resultado': None},
+]
+
+
+def _filtrar_base(df, filtros):
+    for coluna, selecionados in filtros.items():
+        if selecionados is not None:
+            df = df[df[coluna].isin(selecionados)]
+    return df
+
+
+@pytest.mark.parametrize("filtros", FILTROS)
+def test_contagens_iguais_as_da_base(base, filtros):
+    df, cubo = base
+    df = _filtrar_base(df, filtros)
+    cubo = filtrar_cubo(cubo, filtros)
+    assert len(df) > 0
+
+    assert contar(cubo) == len(df)
+    assert contar(cubo, 'Resultado', 'PRODUTIVO') == int((df['Resultado'] == 'PRODUTIVO').sum())
+    assert set(valores(cubo, 'Setor')) == set(df['Setor'].dropna().unique())
+
+    esperado = df['Resultado'].value_counts()
+    esperado = esperado[esperado > 0]
+    pd.testing.assert_series_equal(contagem_por(cubo, 'Resultado').sort_index(), esperado.sort_index(),
+                                   check_names=False, check_index_type=False, check_categorical=False)
+
+    for indice in ['Código Equipe', ['Setor']]:
+        esperado = pd.pivot_table(df, index=indice, columns='Resultado', aggfunc='size', fill_value=0, observed=True)
+        pd.testing.assert_frame_equal(tabela_contagens(cubo, indice), esperado, check_dtype=False,
+                                      check_names=False, check_index_type=False, check_column_type=False, check_categorical=False)
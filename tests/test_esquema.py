@@ -0,0 +1,61 @@
+"""
+Tipagem e validação pelo esquema comparadas com a checagem célula a célula.
+"""
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_fiscalizacao
+from utils.esquema import linhas_com_problema, resumir, tipar, validar
+from utils.fiscalizacao import ESQUEMA_FISCALIZACAO, STATUS_FISCALIZADOS
+
+
+def _data_valida(texto, formato):
+    try:
+        datetime.strptime(texto.strip()[:10], formato)
+        return True
+    except ValueError:
+        return False
+
+
+def _problemas_celula_a_celula(bruto, esquema, status_checados):
+    """
+    O mesmo relatório de `validar`, montado percorrendo as células uma a uma.
+    """
+    problemas = []
+    for i, linha in enumerate(bruto.to_dict('records')):
+        checar_obrigatorias = str(linha['Status']).strip().upper() in status_checados
+        for col, especificacao in esquema.items():
+            texto = str(linha[col]).strip().upper()
+            dominio = especificacao.get('dominio')
+            if dominio and texto and texto not in dominio:
+                problemas.append((i + 2, col, texto, "fora do domínio"))
+            if especificacao.get('obrigatorio') and checar_obrigatorias:
+                if especificacao['tipo'] == 'data' and not _data_valida(linha[col], especificacao['formato']):
+                    problemas.append((i + 2, col, '', f"vazia ou fora do formato {especificacao['formato']}"))
+                elif especificacao['tipo'] != 'data' and not texto:
+                    problemas.append((i + 2, col, '', "vazia"))
+    return sorted(problemas)
+
+
+def test_relatorio_igual_a_checagem_celula_a_celula():
+    bruto = gerar_fiscalizacao(600, seed=13)
+    bruto.loc[5, 'Status'] = 'ARQUIVADO'
+    bruto.loc[8, 'Status Plano Ação'] = 'Em andamento'
+    bruto.loc[[9, 40], 'Agente'] = ''
+    bruto.loc[11, 'Data da analise'] = '2025-01-03'
+
+    df = tipar(bruto.copy(), ESQUEMA_FISCALIZACAO, colapsar_espacos=False)
+    relatorio = validar(df, ESQUEMA_FISCALIZACAO, mascara=df['Status'].isin(STATUS_FISCALIZADOS).to_numpy())
+
+    esperado = _problemas_celula_a_celula(bruto, ESQUEMA_FISCALIZACAO, STATUS_FISCALIZADOS)
+    assert sorted(relatorio.itertuples(index=False, name=None)) == esperado
+    assert linhas_com_problema(relatorio) == len({linha for linha, *_ in esperado})
+    assert resumir(relatorio)['Linhas'].sum() == len(esperado)
+
+
+def test_sem_problemas_relatorio_vazio_com_as_colunas():
+    df = pd.DataFrame({'Status': ['PROCEDENTE'], 'Agente': ['A']})
+    esquema = {'Status': {'tipo': 'categoria', 'dominio': STATUS_FISCALIZADOS}, 'Agente': {'tipo': 'categoria', 'obrigatorio': True}}
+    relatorio = validar(tipar(df, esquema), esquema)
+    assert relatorio.empty and list(relatorio.columns) == ['Linha', 'Coluna', 'Valor', 'Problema']
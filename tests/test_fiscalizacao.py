@@ -0,0 +1,54 @@
+"""
+Base e índice diário da Fiscalização comparados com o cálculo direto sobre as linhas.
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.dados_sinteticos import gerar_fiscalizacao
+from utils.bases import preparar_fiscalizacao
+from utils.fiscalizacao import CONTAGENS, FREQUENCIAS, IndiceDiario, contagens_periodo, contar_linhas, evolucao, filtrar, montar_base
+
+
+@pytest.fixture(scope="module")
+def base():
+    df_base = montar_base(preparar_fiscalizacao(gerar_fiscalizacao(3000, seed=7)))
+    return df_base, IndiceDiario(df_base)
+
+
+def test_semana_de_segunda_a_domingo_rotulada_pela_segunda(base):
+    df_base, indice = base
+    inicio, fim = pd.Timestamp('2025-01-08'), pd.Timestamp('2025-03-20')
+    df_periodo = filtrar(df_base, indice, inicio, fim)
+
+    semanas = evolucao(df_periodo, indice, inicio, fim, FREQUENCIAS['Semana'], filtros_ativos=False)
+    assert (semanas.index.dayofweek == 0).all()
+
+    datas = df_periodo['Data da analise']
+    segundas = datas - pd.to_timedelta(datas.dt.dayofweek, unit='D')
+    esperado = segundas.value_counts().sort_index()
+    pd.testing.assert_series_equal(semanas[semanas > 0], esperado, check_names=False, check_freq=False, check_dtype=False, check_index_type=False)
+
+    # Com filtros ativos o agrupamento é feito sobre as linhas, com os mesmos períodos
+    pelas_linhas = evolucao(df_periodo, indice, inicio, fim, FREQUENCIAS['Semana'], filtros_ativos=True)
+    pd.testing.assert_series_equal(pelas_linhas, semanas, check_names=False, check_freq=False, check_dtype=False, check_index_type=False)
+
+
+@pytest.mark.parametrize("inicio, fim", [
+    ('2025-01-01', '2025-06-29'),
+    ('2025-02-10', '2025-02-10'),
+    ('2025-03-15', '2025-04-02'),
+    ('2024-12-01', '2024-12-31'),
+])
+def test_contagens_do_indice_iguais_as_das_linhas(base, inicio, fim):
+    df_base, indice = base
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    df_periodo = filtrar(df_base, indice, inicio, fim)
+
+    datas = df_base['Data da analise']
+    assert len(df_periodo) == int(datas.between(inicio, fim).sum())
+
+    pelo_indice = contagens_periodo(df_periodo, indice, inicio, fim, filtros_ativos=False)
+    pelas_linhas = contar_linhas(df_periodo)
+    assert pelo_indice['total'] == pelas_linhas['total']
+    for nome in CONTAGENS:
+        pd.testing.assert_series_equal(pelo_indice[nome], pelas_linhas[nome], check_names=False, obj=nome)
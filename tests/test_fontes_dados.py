@@ -0,0 +1,138 @@
+"""
+Fonte de dados: várias abas lidas do `ClienteSintetico` e juntadas com a coluna
+'Origem', e uma só leitura da planilha por vez.
+"""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import utils.fontes_dados as fontes_dados
+
+from benchmarks.dados_sinteticos import AbaSintetica, ClienteSintetico, PlanilhaSintetica, como_valores, gerar_fiscalizacao
+from utils.bases import abrir_aba, preparar_fiscalizacao
+from utils.esquema import linhas_com_problema
+from utils.fiscalizacao import ESQUEMA_FISCALIZACAO, relatorio_em_cache
+from utils.fontes_dados import FonteDados
+
+
+def _valores(n, seed):
+    return [list(linha) for linha in como_valores(gerar_fiscalizacao(n, seed=seed))]
+
+
+@pytest.fixture
+def cliente():
+    return ClienteSintetico({
+        "fiscalizacao": PlanilhaSintetica({"Unidade A": AbaSintetica(_valores(120, 0)), "Unidade B": AbaSintetica(_valores(80, 1))}),
+        "https://exemplo/fiscalizacao-c": PlanilhaSintetica({"Página1": AbaSintetica(_valores(50, 2))}),
+    })
+
+
+@pytest.fixture
+def fonte():
+    abas = {
+        'a': abrir_aba("fiscalizacao", "Unidade A"),
+        'b': abrir_aba("fiscalizacao", "Unidade B"),
+        'c': abrir_aba("https://exemplo/fiscalizacao-c"),
+    }
+    return FonteDados("fiscalizacao_teste", abas, preparar_fiscalizacao)
+
+
+def test_abas_juntadas_com_origem(fonte, cliente):
+    fonte.atualizar(cliente)
+    assert fonte.ultimo_erro is None
+    df, _ = fonte.snapshot
+    assert len(df) == 250
+    assert df['Origem'].value_counts(sort=False).to_dict() == {'a': 120, 'b': 80, 'c': 50}
+    # As categorias das abas são unidas, e não convertidas para texto
+    for col, especificacao in ESQUEMA_FISCALIZACAO.items():
+        if especificacao['tipo'] == 'categoria':
+            assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+
+
+def test_sem_alteracoes_mantem_a_versao(fonte, cliente):
+    fonte.atualizar(cliente)
+    snapshot = fonte.snapshot
+    fonte.atualizar(cliente)
+    assert fonte.snapshot is snapshot
+
+
+def test_relatorio_aponta_a_linha_dentro_de_cada_aba(fonte, cliente):
+    # Uma data inválida na 3ª linha de dados da aba 'b' (linha 4 da planilha)
+    aba_b = cliente.open("fiscalizacao").worksheet("Unidade B")
+    coluna_data = aba_b.valores[0].index('Data da analise')
+    aba_b.valores[3][coluna_data] = "ontem"
+    status = aba_b.valores[0].index('Status')
+    aba_b.valores[3][status] = "PROCEDENTE"
+
+    fonte.atualizar(cliente)
+    df, versao = fonte.snapshot
+    relatorio = relatorio_em_cache(df, versao)
+
+    assert list(relatorio.columns[:2]) == ['Origem', 'Linha']
+    ultima_linha = relatorio['Origem'].map({'a': 121, 'b': 81, 'c': 51}).astype(int)
+    assert relatorio['Linha'].between(2, ultima_linha).all()
+    apontadas = relatorio[(relatorio['Origem'] == 'b') & (relatorio['Coluna'] == 'Data da analise')]
+    assert 4 in apontadas['Linha'].tolist()
+    assert linhas_com_problema(relatorio) == len(relatorio[['Origem', 'Linha']].drop_duplicates())
+
+
+class AbaLenta(AbaSintetica):
+    """
+    Aba que demora a responder e conta as chamadas à API (completas ou não).
+    """
+    def __init__(self, valores):
+        super().__init__(valores)
+        self.leituras = 0
+
+    def get_all_values(self):
+        self.leituras += 1
+        time.sleep(0.2)
+        return super().get_all_values()
+
+    def batch_get(self, faixas):
+        self.leituras += 1
+        return super().batch_get(faixas)
+
+
+def test_primeira_leitura_espera_a_que_ja_esta_em_andamento(monkeypatch):
+    aba = AbaLenta(_valores(50, 0))
+    monkeypatch.setattr(fontes_dados, "obter_cliente", lambda: None)
+    fonte = FonteDados("lenta", lambda cliente: aba, preparar_fiscalizacao)
+
+    # O atualizador começa a ler; logo depois a primeira página pede os dados
+    atualizador = threading.Thread(target=fonte.atualizar, args=(None,))
+    atualizador.start()
+    time.sleep(0.05)
+    df, _ = fonte.obter_snapshot()
+    atualizador.join()
+
+    assert aba.leituras == 1
+    assert len(df) == 50
+
+
+def test_invalidacao_concorrente_nao_quebra_a_leitura(monkeypatch):
+    aba = AbaLenta(_valores(50, 0))
+    monkeypatch.setattr(fontes_dados, "obter_cliente", lambda: None)
+    fonte = FonteDados("lenta", lambda cliente: aba, preparar_fiscalizacao, ttl=0)
+    fonte.atualizar(None)
+
+    # Outra sessão invalida a fonte entre a leitura do snapshot e a do horário
+    snapshot = fonte.snapshot
+    fonte.lido_em = None
+    assert fonte.obter_snapshot() is snapshot
+
+
+def test_ao_atualizar_recebe_cada_dataframe_novo_uma_vez(cliente):
+    recebidos = []
+    fonte = FonteDados("producao_teste", abrir_aba("fiscalizacao", "Unidade A"), preparar_fiscalizacao,
+                       ao_atualizar=recebidos.append)
+    fonte.atualizar(cliente)
+    fonte.atualizar(cliente)
+    assert len(recebidos) == 1 and recebidos[0] is fonte.snapshot[0]
+
+    aba = cliente.open("fiscalizacao").worksheet("Unidade A")
+    aba.valores.append(list(aba.valores[-1]))
+    fonte.atualizar(cliente)
+    assert len(recebidos) == 2 and len(recebidos[1]) == 121
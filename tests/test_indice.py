@@ -0,0 +1,42 @@
+"""
+Índice em bitmaps comparado com as máscaras de `isin` sobre a base.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.dados_sinteticos import gerar_producao
+from utils.bases import padronizar_producao
+from utils.indice import IndiceBitmap
+
+COLUNAS = ('Setor', 'Código Equipe', 'Resultado')
+
+
+@pytest.fixture(scope="module")
+def base():
+    # Quantidade de linhas fora de múltiplos de 8, para exercitar o fim dos bitmaps
+    df = gerar_producao(1003, equipes=30, seed=9)
+    df.loc[::50, 'Setor'] = None
+    df = padronizar_producao(df)
+    return df, IndiceBitmap(df, COLUNAS)
+
+
+@pytest.mark.parametrize("filtros", [
+    {'Resultado': ['PRODUTIVO']},
+    {'Setor': ['CORTE', 'VISTORIA'], 'Código Equipe': None, 'Resultado': ['IMPRODUTIVO']},
+    {'Setor': ['CORTE'], 'Código Equipe': ['MAR-001', 'MAR-004', 'INEXISTENTE']},
+    {'Setor': ['INEXISTENTE']},
+    {'Setor': []},
+])
+def test_posicoes_iguais_as_das_mascaras_isin(base, filtros):
+    df, indice = base
+    esperado = np.ones(len(df), dtype=bool)
+    for coluna, selecionados in filtros.items():
+        if selecionados is not None:
+            esperado &= df[coluna].isin(selecionados).to_numpy()
+    np.testing.assert_array_equal(indice.posicoes(filtros), np.flatnonzero(esperado))
+
+
+def test_sem_filtros_todas_as_linhas(base):
+    _, indice = base
+    assert indice.posicoes({}) is None
+    assert indice.posicoes({coluna: None for coluna in COLUNAS}) is None
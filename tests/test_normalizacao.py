@@ -0,0 +1,36 @@
+"""
+Padronização por dicionário comparada com os métodos `.str` aplicados linha a linha.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.dados_sinteticos import gerar_producao
+from utils.normalizacao import COLUNAS_PRODUCAO, normalizar_texto
+
+
+def _linha_a_linha(serie, colapsar_espacos=True):
+    serie = serie.astype(str).str.strip()
+    if colapsar_espacos:
+        serie = serie.str.replace(r'\s+', ' ', regex=True)
+    return serie.str.upper()
+
+
+@pytest.mark.parametrize("colapsar_espacos", [True, False])
+def test_igual_aos_metodos_str(colapsar_espacos):
+    df = gerar_producao(2000, seed=11)
+    df.loc[::37, 'Setor'] = None
+    # Códigos como vêm do Sheets: números inteiros misturados com texto
+    df['Código Equipe'] = np.where(np.arange(2000) % 5 == 0, np.arange(2000) % 40, df['Código Equipe'])
+
+    for coluna in COLUNAS_PRODUCAO:
+        resultado = normalizar_texto(df[coluna], colapsar_espacos=colapsar_espacos)
+        assert isinstance(resultado.dtype, pd.CategoricalDtype)
+        pd.testing.assert_series_equal(resultado.astype(object), _linha_a_linha(df[coluna], colapsar_espacos).astype(object), obj=coluna)
+
+
+def test_inteiros_lidos_como_float_viram_o_mesmo_texto():
+    # Coluna numérica com células vazias: o pandas lê 101 como 101.0
+    resultado = normalizar_texto(pd.Series([101.0, np.nan, 102.0, 1.5]))
+    assert resultado.iloc[[0, 2, 3]].tolist() == ['101', '102', '1.5']
+    assert pd.isna(resultado.iloc[1])
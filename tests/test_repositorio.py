@@ -0,0 +1,70 @@
+"""
+Repositório de bases: gravar e abrir uma versão devolve os mesmos dados, com a
+versão e o hash registrados no manifesto.
+"""
+import pandas as pd
+import pytest
+
+import utils.repositorio as repositorio
+from benchmarks.dados_sinteticos import como_xlsx, gerar_fiscalizacao, gerar_producao
+from utils.bases import padronizar_producao, preparar_fiscalizacao
+
+
+@pytest.fixture(autouse=True)
+def pasta_repositorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(repositorio, "PASTA_REPOSITORIO", tmp_path)
+    # As versões abertas ficam em cache por (nome, versão), que se repetem entre os testes
+    repositorio._ler_versao.clear()
+    yield tmp_path
+    repositorio._ler_versao.clear()
+
+
+@pytest.fixture
+def fiscalizacao():
+    return preparar_fiscalizacao(gerar_fiscalizacao(400, seed=2))
+
+
+def test_abrir_devolve_o_que_foi_gravado(fiscalizacao):
+    versao = repositorio.salvar_versao("fiscalizacao", fiscalizacao, origem="teste")
+    df, aberta = repositorio.abrir("fiscalizacao")
+
+    assert versao == aberta == 1
+    pd.testing.assert_frame_equal(df, fiscalizacao)
+    registro = repositorio.versoes("fiscalizacao")[-1]
+    assert registro["hash"] == repositorio.hash_dados(fiscalizacao) == repositorio.hash_dados(df)
+    assert registro["linhas"] == len(fiscalizacao) and registro["origem"] == "teste"
+
+
+def test_nova_versao_so_quando_o_conteudo_muda(fiscalizacao, pasta_repositorio):
+    assert repositorio.salvar_versao("fiscalizacao", fiscalizacao) == 1
+    assert repositorio.salvar_versao("fiscalizacao", fiscalizacao.copy()) == 1
+    alterado = fiscalizacao.iloc[:-1]
+    assert repositorio.salvar_versao("fiscalizacao", alterado) == 2
+    assert sorted(p.name for p in (pasta_repositorio / "fiscalizacao").glob("*.parquet")) == ["v0001.parquet", "v0002.parquet"]
+
+    # As versões anteriores continuam abrindo com os próprios dados
+    pd.testing.assert_frame_equal(repositorio.abrir("fiscalizacao", 1)[0], fiscalizacao)
+    pd.testing.assert_frame_equal(repositorio.abrir("fiscalizacao")[0], alterado)
+    assert [r["hash"] for r in repositorio.versoes("fiscalizacao")] == [repositorio.hash_dados(fiscalizacao), repositorio.hash_dados(alterado)]
+
+
+def test_versoes_excedentes_sao_apagadas(fiscalizacao, monkeypatch):
+    monkeypatch.setattr(repositorio, "MAX_VERSOES", 2)
+    for n in (100, 200, 300):
+        repositorio.salvar_versao("fiscalizacao", fiscalizacao.iloc[:n])
+    assert [r["versao"] for r in repositorio.versoes("fiscalizacao")] == [2, 3]
+    with pytest.raises(KeyError):
+        repositorio.abrir("fiscalizacao", 1)
+    with pytest.raises(KeyError):
+        repositorio.abrir("inexistente")
+
+
+def test_ingerir_planilha_igual_a_leitura_do_upload(tmp_path):
+    caminho = tmp_path / "mensal.xlsx"
+    caminho.write_bytes(como_xlsx(gerar_producao(300, seed=6)))
+    versao, df = repositorio.ingerir_planilha("mensal", caminho, padronizar_producao)
+
+    aberta, versao_aberta = repositorio.abrir("mensal")
+    assert versao == versao_aberta == 1
+    pd.testing.assert_frame_equal(aberta, df)
+    assert repositorio.versoes("mensal")[-1]["hash"] == repositorio.hash_dados(aberta)
@@ -0,0 +1,97 @@
+"""
+Sincronização incremental de uma aba contra o `AbaSintetica` (sem rede).
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.dados_sinteticos import AbaSintetica, como_valores, gerar_fiscalizacao
+from utils.bases import preparar_fiscalizacao
+from utils.sincronizacao import SincronizadorPlanilha
+
+
+@pytest.fixture
+def aba():
+    return AbaSintetica([list(linha) for linha in como_valores(gerar_fiscalizacao(200))])
+
+
+def _leitura_completa(aba):
+    return SincronizadorPlanilha().sincronizar(AbaSintetica(aba.valores))
+
+
+def test_primeira_leitura_e_completa(aba):
+    sincronizador = SincronizadorPlanilha()
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "completa"
+    assert len(df) == 200
+    assert list(df.columns) == aba.valores[0]
+
+
+def test_sem_alteracoes_devolve_o_mesmo_dataframe(aba):
+    sincronizador = SincronizadorPlanilha()
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.sincronizar(aba) is df
+    assert sincronizador.ultimo_modo == "sem alterações"
+
+
+def test_linhas_acrescentadas_sao_lidas_de_forma_incremental(aba):
+    sincronizador = SincronizadorPlanilha()
+    sincronizador.sincronizar(aba)
+    aba.valores.extend(list(linha) for linha in como_valores(gerar_fiscalizacao(30, seed=1))[1:])
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "incremental"
+    pd.testing.assert_frame_equal(df, _leitura_completa(aba))
+
+
+def test_acrescimo_mantem_as_colunas_categoricas(aba):
+    sincronizador = SincronizadorPlanilha(preparar=preparar_fiscalizacao)
+    sincronizador.sincronizar(aba)
+    aba.valores.extend(list(linha) for linha in como_valores(gerar_fiscalizacao(30, seed=1))[1:])
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "incremental"
+    assert isinstance(df['Status'].dtype, pd.CategoricalDtype)
+    assert len(df) == 230
+
+
+def test_edicao_da_linha_ancora_forca_leitura_completa(aba):
+    sincronizador = SincronizadorPlanilha()
+    sincronizador.sincronizar(aba)
+    aba.valores[-1][0] = "EDITADA"
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "completa"
+    assert df['Status'].iloc[-1] == "EDITADA"
+
+
+def test_linhas_apagadas_no_fim_forcam_leitura_completa(aba):
+    sincronizador = SincronizadorPlanilha()
+    sincronizador.sincronizar(aba)
+    del aba.valores[-5:]
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "completa"
+    pd.testing.assert_frame_equal(df, _leitura_completa(aba))
+
+
+def test_cabecalho_alterado_forca_leitura_completa(aba):
+    sincronizador = SincronizadorPlanilha()
+    sincronizador.sincronizar(aba)
+    aba.valores[0][1] = "Tipo de Erro"
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "completa"
+    assert "Tipo de Erro" in df.columns
+
+
+def test_edicao_acima_da_ancora_aparece_no_intervalo_completo(aba, monkeypatch):
+    agora = [1_000_000.0]
+    monkeypatch.setattr("utils.sincronizacao.time.time", lambda: agora[0])
+    sincronizador = SincronizadorPlanilha(intervalo_completo=600)
+    sincronizador.sincronizar(aba)
+
+    # 'Status Plano Ação' alterado no meio da planilha: o incremental não enxerga
+    aba.valores[10][5] = "Realizado"
+    agora[0] += 300
+    sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "sem alterações"
+
+    agora[0] += 300
+    df = sincronizador.sincronizar(aba)
+    assert sincronizador.ultimo_modo == "completa"
+    assert df['Status Plano Ação'].iloc[9] == "Realizado"
@@ -0,0 +1,43 @@
+"""
+Busca e ordenação da tabela paginada comparadas com o cálculo direto sobre as linhas.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import utils.tabela as tabela
+from benchmarks.dados_sinteticos import gerar_fiscalizacao
+from utils.bases import preparar_fiscalizacao
+from utils.tabela import FORMATO_DATA, _mascara_busca
+
+
+def _linhas_com_texto(df, texto):
+    texto = texto.lower()
+    como_texto = df.apply(lambda serie: serie.dt.strftime(FORMATO_DATA) if pd.api.types.is_datetime64_any_dtype(serie) else serie.astype(str))
+    return como_texto.apply(lambda serie: serie.str.lower().str.contains(texto, regex=False, na=False)).any(axis=1).to_numpy()
+
+
+def test_busca_encontra_as_datas_no_formato_exibido():
+    df = preparar_fiscalizacao(gerar_fiscalizacao(500, seed=4))
+    assert pd.api.types.is_datetime64_any_dtype(df['Data da analise'])
+
+    for texto in ['15/02/2025', '/03/', 'agente 1', 'procedente']:
+        np.testing.assert_array_equal(_mascara_busca(df, texto), _linhas_com_texto(df, texto), err_msg=texto)
+    assert _mascara_busca(df, '15/02/2025').any()
+
+
+def test_posicoes_guardadas_limitadas_pela_memoria(monkeypatch):
+    monkeypatch.setattr(tabela, "_posicoes", OrderedDict())
+    df = pd.DataFrame({'n': np.arange(100_000)})
+    # Cada vetor de posições de 100 mil linhas ocupa ~0,4 MB: cabem dois
+    monkeypatch.setattr(tabela, "MAX_POSICOES_MB", 1)
+
+    primeiro = tabela.posicoes_em_cache(df, 'v1', '', 'n', False)
+    assert tabela.posicoes_em_cache(df, 'v1', '', 'n', False) is primeiro
+    np.testing.assert_array_equal(primeiro, np.arange(100_000)[::-1])
+
+    for versao in ['v2', 'v3']:
+        tabela.posicoes_em_cache(df, versao, '', 'n', False)
+    assert [chave[0] for chave in tabela._posicoes] == ['v2', 'v3']
+    assert sum(p.nbytes for p in tabela._posicoes.values()) <= 1024 ** 2
@@ -0,0 +1,97 @@
+"""
+Bases de dados do SOC no Google Sheets e a preparação de cada uma.
+
+As fontes são registradas aqui (e não nas páginas) para que o atualizador em
+segundo plano possa pré-carregá-las assim que o app sobe. Cada snapshot novo é
+guardado no repositório local com o nome indicado em `repositorio`.
+
+Cada base lista as suas abas em PLANILHAS_*: origem -> (planilha, aba). Para
+incluir outra unidade ou outro mês basta acrescentar uma entrada; as abas são
+lidas em paralelo e juntadas com a coluna 'Origem'.
+"""
+from utils.esquema import tipar
+from utils.fiscalizacao import ESQUEMA_FISCALIZACAO
+from utils.fontes_dados import TTL_PADRAO, registrar_fonte
+from utils.normalizacao import COLUNAS_PRODUCAO, normalizar_colunas
+
+# A planilha é o nome (que geralmente não inclui a extensão .xlsx) ou a URL;
+# aba None = primeira aba da planilha
+PLANILHAS_MENSAL = {
+    'base': ("base", None),
+}
+PLANILHAS_FISCALIZACAO = {
+    'fiscalizacao': ("https://docs.google.com/spreadsheets/d/1zI6BA_hPSMRRFj1u33Ot3xqPYBrSrnhqv_pSSxBRS6Q/edit?usp=sharing", None),
+}
+
+
+def abrir_aba(planilha, aba=None):
+    """
+    Função que recebe o cliente gspread e abre a aba `aba` (None = primeira) da
+    planilha `planilha` (nome ou URL).
+    """
+    def abrir(cliente):
+        livro = cliente.open_by_url(planilha) if planilha.startswith("https://") else cliente.open(planilha)
+        return livro.sheet1 if aba is None else livro.worksheet(aba)
+    return abrir
+
+
+def _abas(planilhas):
+    return {origem: abrir_aba(planilha, aba) for origem, (planilha, aba) in planilhas.items()}
+
+
+def padronizar_producao(df):
+    """
+    Padroniza as colunas de texto (maiúsculas, sem espaços extras) como categorias.
+    """
+    return normalizar_colunas(df, COLUNAS_PRODUCAO)
+
+
+def preparar_fiscalizacao(df):
+    """
+    Converte as colunas para os tipos do esquema da fiscalização: categorias,
+    data da análise (fora do formato vira NaT) e o indicador 'Com Erro'.
+    """
+    return tipar(df, ESQUEMA_FISCALIZACAO, colapsar_espacos=False)
+
+
+def fechar_historico(df):
+    """
+    Fecha o mês anterior no histórico mensal com a produção lida, se esse mês
+    ainda não estiver lá.
+    """
+    from utils.historico import fechar_mes_da_base, mes_anterior
+
+    try:
+        fechar_mes_da_base(df, mes_anterior())
+    except OSError:
+        # Sem permissão de escrita: o histórico já gravado continua disponível
+        pass
+
+
+def fonte_producao_mensal():
+    """
+    Abas da produção mensal (PLANILHAS_MENSAL).
+    """
+    return registrar_fonte(
+        "producao_mensal",
+        _abas(PLANILHAS_MENSAL),
+        preparar=padronizar_producao,
+        repositorio="producao_mensal",
+        # Só a atualização em segundo plano grava o histórico; as páginas apenas o leem
+        ao_atualizar=fechar_historico
+    )
+
+
+def fonte_fiscalizacao():
+    """
+    Abas da fiscalização (PLANILHAS_FISCALIZACAO).
+    """
+    return registrar_fonte(
+        "fiscalizacao",
+        _abas(PLANILHAS_FISCALIZACAO),
+        preparar=preparar_fiscalizacao,
+        repositorio="fiscalizacao",
+        # A planilha é editada no lugar ('Status Plano Ação' passa de PENDENTE a
+        # REALIZADO), o que só uma leitura completa enxerga
+        intervalo_completo=TTL_PADRAO
+    )
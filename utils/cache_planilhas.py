@@ -0,0 +1,338 @@
+"""
+Cache em disco das planilhas carregadas, em formato colunar (Parquet).
+
+Cada arquivo enviado é identificado pelo hash do seu conteúdo. Na primeira vez o
+.xlsx é lido e convertido para Parquet; nos envios seguintes (inclusive depois
+de reiniciar o app) a leitura é feita direto do Parquet, com memory map.
+
+A conversão lê a planilha em streaming, em blocos de linhas: cada bloco é
+montado só com as colunas necessárias, preparado (padronização, categorias) e
+guardado; no fim os blocos são juntados. O pico de memória acompanha o tamanho
+do resultado, e não o do XML da planilha nem o de um DataFrame bruto inteiro.
+
+Vários arquivos enviados juntos (`carregar_varios_excel`) são convertidos em
+paralelo, um por processo: a leitura do .xlsx é puro Python e não aproveita
+threads. Cada processo grava o seu Parquet no cache e o processo principal só
+lê os resultados (com memory map) e os junta, com a coluna 'Arquivo' indicando
+a origem de cada linha.
+
+O cache tem tamanho limitado (SOC_CACHE_MAX_MB): a cada arquivo gravado, os
+menos usados recentemente são apagados até a pasta caber no limite.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+try:
+    # Leitor em Rust, bem mais rápido que o openpyxl; opcional
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Pasta onde os arquivos convertidos ficam guardados
+PASTA_CACHE = Path(os.environ.get("SOC_PASTA_CACHE", ".cache/planilhas"))
+
+# Aumente este número sempre que a preparação dos dados mudar, para que os
+# arquivos antigos do cache deixem de ser usados.
+VERSAO_CACHE = 3
+
+# Tamanho máximo da pasta do cache, em MB; acima dele os arquivos menos usados são apagados
+MAX_CACHE_MB = float(os.environ.get("SOC_CACHE_MAX_MB", "500"))
+
+# Quantidade de linhas da planilha lidas e preparadas de cada vez
+TAMANHO_BLOCO = int(os.environ.get("SOC_TAMANHO_BLOCO", "50000"))
+
+# Máximo de processos na conversão de vários arquivos (padrão: um por núcleo)
+MAX_PROCESSOS = int(os.environ.get("SOC_PROCESSOS", "0")) or os.cpu_count() or 1
+
+
+def hash_conteudo(dados):
+    """
+    Retorna o hash (hexadecimal) do conteúdo de um arquivo.
+    """
+    return hashlib.blake2b(dados, digest_size=20).hexdigest()
+
+
+def _tornar_compativel_com_arrow(df):
+    """
+    Converte para texto as colunas com tipos misturados, que o Parquet não aceita.
+    """
+    for col in df.columns:
+        if df[col].dtype == object:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def salvar_parquet(df, caminho):
+    """
+    Grava o DataFrame em Parquet (zstd) de forma atômica (arquivo temporário + rename).
+    """
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    tabela = pa.Table.from_pandas(_tornar_compativel_com_arrow(df), preserve_index=False)
+    temporario = caminho.with_suffix(f".{os.getpid()}.tmp")
+    pq.write_table(tabela, temporario, compression="zstd")
+    os.replace(temporario, caminho)
+
+
+def _linhas_planilha(dados):
+    """
+    Percorre as linhas da primeira aba como tuplas de valores (células vazias = None),
+    sem carregar a planilha inteira como objetos Python.
+    """
+    if CalamineWorkbook is not None:
+        aba = CalamineWorkbook.from_filelike(io.BytesIO(dados)).get_sheet_by_index(0)
+        for linha in aba.iter_rows():
+            yield tuple(None if valor == "" else valor for valor in linha)
+        return
+
+    import openpyxl  # desnecessário quando a planilha já está no cache em Parquet
+
+    livro = openpyxl.load_workbook(io.BytesIO(dados), read_only=True, data_only=True)
+    try:
+        yield from livro.worksheets[0].iter_rows(values_only=True)
+    finally:
+        livro.close()
+
+
+def _nomes_cabecalho(cabecalho):
+    """
+    Nomes das colunas como o `pd.read_excel` os gera (Unnamed: 3, Erro.1, ...).
+    """
+    nomes, vistos = [], {}
+    for i, nome in enumerate(cabecalho):
+        nome = f"Unnamed: {i}" if nome is None else str(nome)
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        nomes.append(nome)
+    return nomes
+
+
+def _juntar_blocos(blocos):
+    """
+    Concatena os blocos preparados; colunas categóricas em todos os blocos
+    continuam categóricas. Uma coluna que falta em algum bloco (planilhas com
+    cabeçalhos diferentes) fica vazia nas linhas dele.
+    """
+    if len(blocos) == 1:
+        return blocos[0]
+    df = pd.concat(blocos, ignore_index=True)
+    for col in df.columns:
+        series = [bloco[col] for bloco in blocos if col in bloco.columns]
+        if len(series) == len(blocos) and all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            df[col] = union_categoricals(series)
+    return df
+
+
+def ler_excel_em_blocos(dados, preparar, colunas=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê a primeira aba de um .xlsx (em bytes) de `tamanho_bloco` em `tamanho_bloco`
+    linhas, aplicando `preparar` a cada bloco.
+
+    `colunas` limita as colunas guardadas (None = todas). Como cada bloco é
+    preparado separadamente, `preparar` deve tratar as linhas de forma independente.
+    Linhas vazias no fim da aba são descartadas, como no `pd.read_excel`.
+    """
+    linhas = _linhas_planilha(dados)
+    nomes = _nomes_cabecalho(next(linhas, ()))
+    largura = len(nomes)
+    if colunas is None:
+        posicoes = list(range(largura))
+    else:
+        posicoes = [nomes.index(col) for col in colunas if col in nomes]
+    nomes = [nomes[i] for i in posicoes]
+
+    blocos, bloco, vazias = [], [], 0
+
+    def fechar_bloco():
+        df = pd.DataFrame.from_records(bloco, columns=nomes, coerce_float=True)
+        blocos.append(preparar(df))
+        bloco.clear()
+
+    for linha in linhas:
+        if all(valor is None for valor in linha):
+            # Só entram na base se aparecer alguma linha preenchida depois
+            vazias += 1
+            continue
+        if len(linha) < largura:
+            linha = linha + (None,) * (largura - len(linha))
+        bloco.extend([(None,) * len(posicoes)] * vazias)
+        vazias = 0
+        bloco.append(tuple(linha[i] for i in posicoes))
+        if len(bloco) >= tamanho_bloco:
+            fechar_bloco()
+    if bloco or not blocos:
+        fechar_bloco()
+    return _juntar_blocos(blocos)
+
+
+def ler_parquet(caminho):
+    """
+    Lê um arquivo Parquet do cache usando memory map.
+    """
+    return pq.read_table(caminho, memory_map=True).to_pandas()
+
+
+def _caminho_cache(dados, colunas):
+    chave = hash_conteudo(dados)
+    if colunas is not None:
+        chave += "-" + hash_conteudo("|".join(colunas).encode())[:8]
+    return PASTA_CACHE / f"{chave}-v{VERSAO_CACHE}.parquet"
+
+
+def _ler_do_cache(caminho):
+    """
+    Lê o Parquet do cache; None se não existir ou estiver corrompido (é descartado).
+    """
+    if caminho.exists():
+        try:
+            df = ler_parquet(caminho)
+        except (OSError, pa.ArrowException):
+            caminho.unlink(missing_ok=True)
+            return None
+        try:
+            # A data de modificação marca o último uso, para a limpeza do cache
+            os.utime(caminho)
+        except OSError:
+            pass
+        return df
+    return None
+
+
+def limpar_cache(pasta=None, max_mb=None, manter=None):
+    """
+    Apaga os arquivos do cache usados há mais tempo até a pasta caber em
+    `max_mb` (padrão: MAX_CACHE_MB), sem apagar os caminhos em `manter` (os
+    arquivos recém-gravados). Retorna quantos arquivos foram apagados.
+    """
+    pasta = PASTA_CACHE if pasta is None else pasta
+    manter = set(manter or ())
+    limite = (MAX_CACHE_MB if max_mb is None else max_mb) * 1024 ** 2
+    arquivos = []
+    for caminho in pasta.glob("*.parquet"):
+        try:
+            info = caminho.stat()
+        except FileNotFoundError:
+            continue
+        arquivos.append((info.st_mtime, info.st_size, caminho))
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    apagados = 0
+    for _, tamanho, caminho in sorted(arquivos, key=lambda a: a[0]):
+        if total <= limite:
+            break
+        if caminho in manter:
+            continue
+        caminho.unlink(missing_ok=True)
+        total -= tamanho
+        apagados += 1
+    return apagados
+
+
+def _converter(dados, preparar, colunas, caminho, limpar=True):
+    """
+    Lê o .xlsx e grava o resultado no cache. Falhar ao gravar não impede o uso da planilha.
+    Com `limpar=False` a limpeza do cache fica a cargo de quem chamou.
+    """
+    df = ler_excel_em_blocos(dados, preparar, colunas=colunas)
+    try:
+        salvar_parquet(df, caminho)
+        if limpar:
+            limpar_cache(caminho.parent, manter=[caminho])
+    except (OSError, pa.ArrowException):
+        pass
+    return df
+
+
+def carregar_excel_com_cache(arquivo_carregado, preparar, colunas=None):
+    """
+    Lê uma planilha .xlsx passando pelo cache em disco.
+
+    `preparar` recebe cada bloco bruto de linhas e devolve o bloco já limpo; o
+    resultado (blocos juntados) é o que fica guardado no cache. `colunas`
+    limita as colunas lidas (None = todas).
+    """
+    dados = arquivo_carregado.getvalue()
+    caminho = _caminho_cache(dados, colunas)
+    df = _ler_do_cache(caminho)
+    if df is None:
+        df = _converter(dados, preparar, colunas, caminho)
+    return df
+
+
+def _converter_em_processo(dados, preparar, colunas, caminho):
+    """
+    Conversão executada num processo separado: devolve só o caminho do Parquet
+    gravado (ou o DataFrame, se o cache não puder ser gravado). Não limpa o
+    cache: os arquivos dos outros processos do lote ainda não foram lidos.
+    """
+    df = _converter(dados, preparar, colunas, caminho, limpar=False)
+    return caminho if caminho.exists() else df
+
+
+def carregar_varios_excel(arquivos_carregados, preparar, colunas=None, max_processos=MAX_PROCESSOS):
+    """
+    Lê várias planilhas .xlsx (cada uma pelo cache em disco) e as junta num só
+    DataFrame, com a coluna categórica 'Arquivo' (nome do arquivo de origem).
+
+    As planilhas que ainda não estão no cache são convertidas em paralelo, em
+    até `max_processos` processos. `preparar` precisa poder ser enviado a outro
+    processo: uma função de módulo (ou `functools.partial` de uma), e não uma
+    função definida dentro do script da página.
+    """
+    resultados = {}
+    pendentes = []
+    for i, arquivo in enumerate(arquivos_carregados):
+        dados = arquivo.getvalue()
+        caminho = _caminho_cache(dados, colunas)
+        df = _ler_do_cache(caminho)
+        if df is None:
+            pendentes.append((i, dados, caminho))
+        else:
+            resultados[i] = df
+
+    if len(pendentes) == 1 or max_processos <= 1:
+        for i, dados, caminho in pendentes:
+            resultados[i] = _converter(dados, preparar, colunas, caminho)
+    elif pendentes:
+        # "spawn": não herda as threads do servidor do Streamlit (fork com threads é inseguro)
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(len(pendentes), max_processos), mp_context=contexto) as executor:
+            futuros = [(i, dados, caminho, executor.submit(_converter_em_processo, dados, preparar, colunas, caminho))
+                       for i, dados, caminho in pendentes]
+            for i, dados, caminho, futuro in futuros:
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    raise ValueError(f"{arquivos_carregados[i].name}: {e}") from e
+                if isinstance(resultado, Path):
+                    resultado = _ler_do_cache(resultado)
+                if resultado is None:
+                    # Apagado por outra sessão antes da leitura: converte aqui mesmo
+                    resultado = _converter(dados, preparar, colunas, caminho, limpar=False)
+                resultados[i] = resultado
+        # Uma só limpeza, depois de todos os arquivos do lote lidos
+        try:
+            limpar_cache(PASTA_CACHE, manter=[caminho for _, _, caminho in pendentes])
+        except OSError:
+            pass
+
+    blocos = []
+    for i, arquivo in enumerate(arquivos_carregados):
+        df = resultados[i]
+        df['Arquivo'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), [arquivo.name])
+        blocos.append(df)
+    return _juntar_blocos(blocos)
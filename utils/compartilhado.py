@@ -0,0 +1,196 @@
+"""
+Bases compartilhadas entre vários processos do app, em memória mapeada.
+
+Com vários processos do Streamlit atrás de um balanceador, cada um leria as
+planilhas e guardaria a sua própria cópia dos DataFrames. Em vez disso, um
+único processo publicador (`python publicar_bases.py`) lê as bases e publica
+cada snapshot como um arquivo Arrow IPC sem compressão, de preferência numa
+pasta em memória (/dev/shm). Os processos do app, iniciados com
+SOC_DADOS_COMPARTILHADOS=1, só mapeiam o arquivo: os códigos das categorias,
+os números, os textos, as datas e os booleanos do DataFrame apontam direto
+para as páginas do arquivo, que o sistema operacional mantém uma única vez
+para todos os processos.
+
+Cada publicação é um arquivo novo; o ponteiro `<nome>.json` indica a versão
+atual e é trocado de forma atômica. A cada leitura o processo confere o
+ponteiro (um `stat`) e só mapeia de novo quando ele mudou. Os DataFrames são
+somente leitura, como todo snapshot da camada de dados.
+
+O botão "Atualizar dados" das páginas não relê nada no processo do app: ele
+deixa um pedido (`<nome>.atualizar`) que o publicador atende sem esperar o fim
+do intervalo.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.instrumentacao import registrar_execucao
+
+_PADRAO = "/dev/shm/soc_dashboard" if Path("/dev/shm").is_dir() else ".cache/compartilhado"
+PASTA_COMPARTILHADA = Path(os.environ.get("SOC_PASTA_COMPARTILHADA", _PADRAO))
+
+# Arquivos mantidos além do atual: um processo pode estar abrindo o anterior
+ARQUIVOS_ANTERIORES = 1
+
+_lock = threading.Lock()
+# nome -> (mtime do ponteiro, arquivo, ((DataFrame, hash), horário))
+_mapeados = {}
+
+
+def _ponteiro(nome):
+    return PASTA_COMPARTILHADA / f"{nome}.json"
+
+
+def ler_ponteiro(nome):
+    """
+    Versão publicada da base `nome` (dicionário do ponteiro); None se não houver.
+    """
+    try:
+        with open(_ponteiro(nome), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _codificar(df):
+    """
+    Datas e booleanos viram inteiros: o Arrow guardaria o NaT como nulo e os
+    booleanos em bits, e os dois teriam de ser copiados ao voltar para o pandas.
+    """
+    tipos = {}
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if serie.dtype.kind == 'M':
+            tipos[col] = str(serie.dtype)
+            colunas[col] = serie.to_numpy().view('int64')
+        elif serie.dtype == bool:
+            tipos[col] = 'bool'
+            colunas[col] = serie.to_numpy().view('uint8')
+        else:
+            colunas[col] = serie
+    tabela = pa.Table.from_pandas(pd.DataFrame(colunas, copy=False), preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[b"soc_tipos"] = json.dumps(tipos).encode()
+    return tabela.replace_schema_metadata(metadados)
+
+
+def _gravar_ponteiro(nome, ponteiro):
+    temporario = _ponteiro(nome).with_suffix(f".{os.getpid()}.tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(ponteiro, f, ensure_ascii=False)
+    os.replace(temporario, _ponteiro(nome))
+
+
+def publicar(nome, df, horario=None, hash_atual=None):
+    """
+    Publica `df` como versão nova da base `nome` e retorna o número da versão.
+    Se o conteúdo for igual ao da versão atual, só o horário da leitura é
+    atualizado no ponteiro. `hash_atual` evita recalcular o hash de `df`.
+    """
+    from utils.repositorio import hash_dados
+
+    if hash_atual is None:
+        hash_atual = hash_dados(df)
+    horario = horario if horario is not None else time.time()
+    with _lock:
+        ponteiro = ler_ponteiro(nome)
+        if ponteiro is not None and ponteiro["hash"] == hash_atual:
+            if ponteiro["horario"] != horario:
+                _gravar_ponteiro(nome, ponteiro | {"horario": horario})
+            return ponteiro["versao"]
+
+        versao = ponteiro["versao"] + 1 if ponteiro else 1
+        arquivo = f"{nome}-{versao:06d}.arrow"
+        PASTA_COMPARTILHADA.mkdir(parents=True, exist_ok=True)
+        tabela = _codificar(df)
+        temporario = PASTA_COMPARTILHADA / f"{arquivo}.{os.getpid()}.tmp"
+        with pa.OSFile(str(temporario), "wb") as saida, pa.ipc.new_file(saida, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        os.replace(temporario, PASTA_COMPARTILHADA / arquivo)
+
+        novo = {
+            "versao": versao,
+            "arquivo": arquivo,
+            "hash": hash_atual,
+            "horario": horario,
+            "linhas": len(df),
+            "anteriores": ([ponteiro["arquivo"]] + ponteiro["anteriores"])[:ARQUIVOS_ANTERIORES] if ponteiro else [],
+        }
+        _gravar_ponteiro(nome, novo)
+
+        # Apagar um arquivo mapeado não afeta quem já o mapeou (a memória só é
+        # liberada quando o último processo o solta)
+        if ponteiro:
+            for antigo in ([ponteiro["arquivo"]] + ponteiro["anteriores"])[ARQUIVOS_ANTERIORES:]:
+                (PASTA_COMPARTILHADA / antigo).unlink(missing_ok=True)
+        return versao
+
+
+def pedir_atualizacao(nome):
+    """
+    Pede ao publicador uma releitura completa da base `nome`.
+    """
+    PASTA_COMPARTILHADA.mkdir(parents=True, exist_ok=True)
+    (PASTA_COMPARTILHADA / f"{nome}.atualizar").touch()
+
+
+def pedidos_atualizacao():
+    """
+    Nomes das bases com releitura pedida pelas páginas. Os pedidos são consumidos.
+    """
+    nomes = []
+    for caminho in PASTA_COMPARTILHADA.glob("*.atualizar"):
+        caminho.unlink(missing_ok=True)
+        nomes.append(caminho.stem)
+    return nomes
+
+
+def mapear(caminho):
+    """
+    DataFrame de um arquivo publicado, sem copiar os dados para a memória do processo.
+    """
+    registrar_execucao()
+    buffer = pa.memory_map(str(caminho)).read_buffer()
+    tabela = pa.ipc.open_file(buffer).read_all()
+    tipos = json.loads((tabela.schema.metadata or {}).get(b"soc_tipos", b"{}"))
+    # split_blocks: cada coluna no seu bloco, sem juntar (e copiar) colunas do mesmo tipo
+    df = tabela.to_pandas(split_blocks=True)
+    colunas = {col: df[col].array for col in df.columns}
+    for col, tipo in tipos.items():
+        colunas[col] = df[col].to_numpy().view(np.dtype(tipo))
+    # Atribuir as colunas uma a uma (df[col] = ...) faria cópias
+    return pd.DataFrame(colunas, copy=False)
+
+
+def obter(nome):
+    """
+    ((DataFrame, hash), horário da leitura da planilha) da versão publicada da
+    base `nome`, ou None se ela ainda não foi publicada. O hash do conteúdo é a
+    versão dos dados; o DataFrame só é mapeado de novo quando o arquivo muda.
+    """
+    try:
+        mtime = _ponteiro(nome).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    atual = _mapeados.get(nome)
+    if atual is not None and atual[0] == mtime:
+        return atual[2]
+
+    with _lock:
+        ponteiro = ler_ponteiro(nome)
+        if ponteiro is None:
+            return None
+        if atual is not None and atual[1] == ponteiro["arquivo"]:
+            snapshot = atual[2][0]
+        else:
+            snapshot = (mapear(PASTA_COMPARTILHADA / ponteiro["arquivo"]), ponteiro["hash"])
+        publicado = (snapshot, ponteiro["horario"])
+        _mapeados[nome] = (mtime, ponteiro["arquivo"], publicado)
+        return publicado
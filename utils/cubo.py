@@ -0,0 +1,70 @@
+"""
+Cubo de contagens das páginas de produção.
+
+Todos os KPIs, gráficos e tabelas de resumo são contagens sobre (Setor, Código
+Equipe, Resultado). O cubo guarda essas contagens, calculadas uma única vez por
+carga de dados; filtros e resumos passam a trabalhar sobre ele, que tem no
+máximo algumas centenas de linhas, em vez de percorrer a base inteira.
+"""
+import streamlit as st
+
+from utils.instrumentacao import registrar_execucao
+
+DIMENSOES = ['Setor', 'Código Equipe', 'Resultado']
+
+
+def montar_cubo(df, dimensoes=DIMENSOES):
+    """
+    Retorna um DataFrame com uma linha por combinação das dimensões e a coluna 'Contagem'.
+    """
+    return df.groupby(dimensoes, observed=True, dropna=False).size().rename('Contagem').reset_index()
+
+
+@st.cache_data(max_entries=8)
+def cubo_em_cache(_df, versao):
+    """
+    Monta o cubo uma vez por versão dos dados (o DataFrame em si não é hasheado).
+    """
+    registrar_execucao()
+    return montar_cubo(_df)
+
+
+def filtrar_cubo(cubo, filtros):
+    """
+    Aplica os filtros {coluna: valores selecionados}; `None` significa "todos".
+    """
+    for coluna, valores in filtros.items():
+        if valores is not None:
+            cubo = cubo[cubo[coluna].isin(valores)]
+    return cubo
+
+
+def contar(cubo, coluna=None, valor=None):
+    """
+    Total de atividades do cubo, ou apenas daquelas em que `coluna == valor`.
+    """
+    if coluna is not None:
+        cubo = cubo[cubo[coluna] == valor]
+    return int(cubo['Contagem'].sum())
+
+
+def valores(cubo, coluna):
+    """
+    Valores distintos de uma dimensão, na ordem em que aparecem nos dados.
+    """
+    return cubo[coluna].dropna().unique().tolist()
+
+
+def contagem_por(cubo, coluna):
+    """
+    Série com o total por valor da dimensão (sem os valores zerados).
+    """
+    contagens = cubo.groupby(coluna, observed=True)['Contagem'].sum()
+    return contagens[contagens > 0]
+
+
+def tabela_contagens(cubo, indice, colunas='Resultado'):
+    """
+    Equivalente a `pd.pivot_table(df, index=indice, columns=colunas, aggfunc='size')` sobre a base.
+    """
+    return cubo.pivot_table(index=indice, columns=colunas, values='Contagem', aggfunc='sum', fill_value=0, observed=True)
@@ -0,0 +1,140 @@
+"""
+Esquema declarado das bases: tipo de cada coluna, domínio dos valores e formato
+das datas.
+
+Um esquema é um dicionário coluna -> especificação:
+
+    {'tipo': 'categoria'}                      texto padronizado (veja `normalizar_texto`)
+    {'tipo': 'categoria', 'dominio': [...]}    valores esperados, primeiros no dicionário
+    {'tipo': 'data', 'formato': '%d/%m/%Y'}    datetime64; fora do formato vira NaT
+    'obrigatorio': True                        vazio é apontado por `validar`
+    'indicador': 'Com Erro'                    coluna booleana extra: célula preenchida
+
+`tipar` converte as colunas de texto vindas do Sheets (ou de um .xlsx) numa só
+passada. Como na padronização, cada conversão é feita sobre os valores
+distintos da coluna, e não linha a linha. `validar` lista as linhas que não
+seguem o esquema; numa base que junta várias abas, pela aba ('Origem') e pela
+linha dentro dela.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.normalizacao import normalizar_texto
+
+COLUNAS_RELATORIO = ['Linha', 'Coluna', 'Valor', 'Problema']
+# Coluna que indica a aba de cada linha (veja utils/sincronizacao.py)
+COLUNA_ORIGEM = 'Origem'
+
+
+def _preenchidas(serie):
+    """
+    Células não vazias (nem NaN/NaT, nem texto vazio).
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.notna()
+    return serie.notna() & (serie != '')
+
+
+def _tipar_categoria(serie, especificacao, colapsar_espacos):
+    if serie.hasnans:
+        # Célula vazia do .xlsx (None) vale o mesmo que a do Sheets ('')
+        serie = serie.fillna('')
+    serie = normalizar_texto(serie, colapsar_espacos=colapsar_espacos)
+    dominio = especificacao.get('dominio')
+    if dominio:
+        # Domínio primeiro, na ordem declarada; valores fora dele são mantidos no fim
+        extras = [valor for valor in serie.cat.categories if valor not in dominio]
+        serie = serie.cat.set_categories(list(dominio) + extras)
+    return serie
+
+
+def _tipar_data(serie, formato):
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    codigos, valores = pd.factorize(serie)
+    # exact=False: aceita o horário depois da data ("03/01/2025 10:00")
+    datas = pd.to_datetime(pd.Series(valores, dtype=object), format=formato, exact=False, errors='coerce')
+    # Código -1 (célula vazia) pega o NaT acrescentado no fim
+    datas = np.append(datas.to_numpy(), np.datetime64('NaT')).astype(datas.dtype)
+    return pd.Series(datas[codigos], index=serie.index, name=serie.name)
+
+
+def tipar(df, esquema, colapsar_espacos=True):
+    """
+    Converte as colunas do esquema presentes no DataFrame para os tipos
+    declarados (categorias, datas e indicadores booleanos).
+    """
+    for col, especificacao in esquema.items():
+        if col not in df.columns:
+            continue
+        if especificacao['tipo'] == 'data':
+            df[col] = _tipar_data(df[col], especificacao['formato'])
+        else:
+            df[col] = _tipar_categoria(df[col], especificacao, colapsar_espacos)
+        if 'indicador' in especificacao:
+            df[especificacao['indicador']] = _preenchidas(df[col]).to_numpy()
+    return df
+
+
+def validar(df, esquema, mascara=None):
+    """
+    Linhas de um DataFrame já tipado que não seguem o esquema: valores fora do
+    domínio e, nas colunas obrigatórias, células vazias ou datas fora do formato.
+
+    `mascara` (opcional) limita a checagem das colunas obrigatórias às linhas
+    que de fato entram na base. 'Linha' é o número da linha na planilha
+    (o cabeçalho é a linha 1). Se o DataFrame tiver a coluna 'Origem', ela
+    entra no relatório e 'Linha' é contada dentro de cada aba.
+    """
+    linhas = np.arange(len(df)) + 2
+    colunas = COLUNAS_RELATORIO
+    origens = None
+    if COLUNA_ORIGEM in df.columns:
+        linhas = df.groupby(COLUNA_ORIGEM, observed=True, sort=False).cumcount().to_numpy() + 2
+        colunas = [COLUNA_ORIGEM] + COLUNAS_RELATORIO
+        origens = df[COLUNA_ORIGEM].array
+
+    def apontar(selecionadas, col, valores, problema):
+        parte = {'Linha': linhas[selecionadas], 'Coluna': col, 'Valor': valores, 'Problema': problema}
+        if origens is not None:
+            parte[COLUNA_ORIGEM] = origens[selecionadas]
+        return pd.DataFrame(parte)
+
+    partes = []
+    for col, especificacao in esquema.items():
+        if col not in df.columns:
+            continue
+        serie = df[col]
+        dominio = especificacao.get('dominio')
+        if dominio:
+            fora = (_preenchidas(serie) & ~serie.isin(dominio)).to_numpy()
+            partes.append(apontar(fora, col, serie[fora].astype(str).to_numpy(), "fora do domínio"))
+        if especificacao.get('obrigatorio'):
+            vazias = ~_preenchidas(serie).to_numpy()
+            if mascara is not None:
+                vazias &= np.asarray(mascara)
+            if especificacao['tipo'] == 'data':
+                problema = f"vazia ou fora do formato {especificacao['formato']}"
+            else:
+                problema = "vazia"
+            partes.append(apontar(vazias, col, '', problema))
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    # Na ordem das abas e, dentro de cada uma, das linhas
+    ordem = colunas[:colunas.index('Linha') + 1]
+    return pd.concat(partes, ignore_index=True)[colunas].sort_values(ordem, kind='stable', ignore_index=True)
+
+
+def linhas_com_problema(relatorio):
+    """
+    Quantidade de linhas distintas da planilha (de todas as abas) no relatório.
+    """
+    return len(relatorio[[col for col in (COLUNA_ORIGEM, 'Linha') if col in relatorio.columns]].drop_duplicates())
+
+
+def resumir(relatorio):
+    """
+    Quantidade de linhas por coluna, problema e valor, da mais frequente para a menos.
+    """
+    resumo = relatorio.groupby(['Coluna', 'Problema', 'Valor'], sort=False).size().rename('Linhas')
+    return resumo.sort_values(ascending=False, kind='stable').reset_index()
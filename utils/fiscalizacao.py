@@ -0,0 +1,211 @@
+"""
+Base, índice de datas e filtros da página de Fiscalização.
+
+O snapshot vindo da camada de dados é compartilhado entre as sessões e nunca é
+alterado. Uma vez por versão dos dados são montados:
+
+- a base fiscalizada, ordenada pela data da análise;
+- um índice diário com as contagens acumuladas (somas de prefixo) por dia de
+  tudo o que a página exibe: status, tipos de erro, plano de ação e
+  improcedentes por agente.
+
+A cada rerun o período vira uma fatia contínua da base, achada por busca
+binária (`searchsorted`). Sem filtros categóricos, KPIs e gráficos saem da
+diferença entre duas somas de prefixo, sem percorrer as linhas.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.esquema import validar
+from utils.instrumentacao import registrar_execucao
+
+STATUS_FISCALIZADOS = ['PROCEDENTE', 'IMPROCEDENTE']
+# Status legítimos das linhas que ainda não entram na base
+STATUS_NAO_FISCALIZADOS = ['NÃO FISCALIZADO']
+STATUS_PLANO_ACAO = ['PENDENTE', 'REALIZADO']
+
+# Esquema da planilha de fiscalização (veja utils/esquema.py)
+ESQUEMA_FISCALIZACAO = {
+    'Status': {'tipo': 'categoria', 'dominio': STATUS_FISCALIZADOS + STATUS_NAO_FISCALIZADOS},
+    'Erro': {'tipo': 'categoria', 'indicador': 'Com Erro'},
+    'Agente': {'tipo': 'categoria', 'obrigatorio': True},
+    'Data da analise': {'tipo': 'data', 'formato': '%d/%m/%Y', 'obrigatorio': True},
+    'Responsável': {'tipo': 'categoria'},
+    'Status Plano Ação': {'tipo': 'categoria', 'dominio': STATUS_PLANO_ACAO},
+}
+COLUNAS_ESSENCIAIS = list(ESQUEMA_FISCALIZACAO)
+
+# Rótulos da interface -> frequências do pandas. Os períodos são rotulados pelo
+# primeiro dia (`label`/`closed='left'`): a semana vai de segunda a domingo.
+FREQUENCIAS = {'Dia': 'D', 'Semana': 'W-MON', 'Mês': 'MS'}
+
+# Contagens exibidas na página: nome -> (coluna contada, condição para a linha entrar)
+CONTAGENS = {
+    'Status': ('Status', None),
+    'Erro': ('Erro', lambda df: df['Com Erro']),
+    'Status Plano Ação': ('Status Plano Ação', lambda df: df['Status Plano Ação'].isin(STATUS_PLANO_ACAO)),
+    'Agente': ('Agente', lambda df: df['Status'] == 'IMPROCEDENTE'),
+}
+
+
+def montar_base(df):
+    """
+    Linhas que foram de facto fiscalizadas e cuja data pôde ser convertida,
+    ordenadas pela data da análise.
+    """
+    mascara = df['Data da analise'].notna() & df['Status'].isin(STATUS_FISCALIZADOS)
+    return df[mascara].sort_values('Data da analise', kind='stable')
+
+
+def _codigos(df, nome):
+    """
+    Código por linha (-1 = linha fora da contagem) e rótulos da contagem `nome`.
+    """
+    coluna, condicao = CONTAGENS[nome]
+    if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+        codigos, rotulos = df[coluna].cat.codes.to_numpy(), df[coluna].cat.categories
+    else:
+        codigos, rotulos = pd.factorize(df[coluna])
+    if condicao is not None:
+        codigos = np.where(condicao(df).to_numpy(), codigos, -1)
+    return codigos, rotulos
+
+
+def _serie_contagem(contagens, rotulos):
+    """
+    Série no formato de `value_counts()`: sem zeros e em ordem decrescente.
+    """
+    serie = pd.Series(contagens, index=pd.Index(rotulos, dtype=object))
+    return serie[serie > 0].sort_values(ascending=False, kind='stable')
+
+
+def contar_linhas(df):
+    """
+    Todas as contagens da página calculadas sobre as linhas de `df`.
+    """
+    resultado = {'total': len(df)}
+    for nome in CONTAGENS:
+        codigos, rotulos = _codigos(df, nome)
+        resultado[nome] = _serie_contagem(np.bincount(codigos[codigos >= 0], minlength=len(rotulos)), rotulos)
+    return resultado
+
+
+class IndiceDiario:
+    """
+    Índice de uma base ordenada por data: dias presentes e, para cada contagem,
+    uma matriz (dias + 1) x valores com as somas acumuladas até cada dia.
+    """
+
+    def __init__(self, df_base):
+        self.datas = df_base['Data da analise'].to_numpy()
+        self.dias, dia_da_linha = np.unique(self.datas.astype('datetime64[D]'), return_inverse=True)
+        total_dias = len(self.dias)
+
+        def acumular(codigos, quantidade):
+            validas = codigos >= 0
+            por_dia = np.bincount(
+                dia_da_linha[validas] * quantidade + codigos[validas],
+                minlength=total_dias * quantidade
+            ).reshape(total_dias, quantidade)
+            return np.vstack([np.zeros((1, quantidade), dtype=np.int64), np.cumsum(por_dia, axis=0)])
+
+        self.total = acumular(np.zeros(len(self.datas), dtype=np.int64), 1)[:, 0]
+        self.acumulados = {}
+        for nome in CONTAGENS:
+            codigos, rotulos = _codigos(df_base, nome)
+            self.acumulados[nome] = (acumular(codigos, len(rotulos)), rotulos)
+
+    @property
+    def vazio(self):
+        return len(self.dias) == 0
+
+    def _para_datas(self, valor):
+        return pd.Timestamp(valor).to_datetime64().astype(self.datas.dtype)
+
+    def fatia(self, inicio, fim):
+        """
+        Posições [i, j) das linhas com data entre `inicio` e `fim` (inclusive).
+        """
+        i = np.searchsorted(self.datas, self._para_datas(inicio), side='left')
+        j = np.searchsorted(self.datas, self._para_datas(fim), side='right')
+        return i, j
+
+    def _fatia_dias(self, data_inicio, data_fim):
+        a = np.searchsorted(self.dias, np.datetime64(data_inicio, 'D'), side='left')
+        b = np.searchsorted(self.dias, np.datetime64(data_fim, 'D'), side='right')
+        return a, b
+
+    def contagens(self, data_inicio, data_fim):
+        """
+        As mesmas contagens de `contar_linhas` para o período (datas inclusivas),
+        em tempo proporcional à quantidade de valores, não de linhas.
+        """
+        a, b = self._fatia_dias(data_inicio, data_fim)
+        resultado = {'total': int(self.total[b] - self.total[a])}
+        for nome, (acumulado, rotulos) in self.acumulados.items():
+            resultado[nome] = _serie_contagem(acumulado[b] - acumulado[a], rotulos)
+        return resultado
+
+    def contagens_por_periodo(self, data_inicio, data_fim, frequencia='D'):
+        """
+        Total de fiscalizações por dia/semana/mês do período, a partir das contagens diárias.
+        """
+        a, b = self._fatia_dias(data_inicio, data_fim)
+        por_dia = pd.Series(np.diff(self.total[a:b + 1]), index=pd.DatetimeIndex(self.dias[a:b]))
+        return por_dia.resample(frequencia, label='left', closed='left').sum()
+
+
+@st.cache_resource(max_entries=4)
+def base_em_cache(_df, versao):
+    """
+    Monta a base e o índice diário uma vez por versão dos dados; a mesma
+    instância atende todas as sessões.
+    """
+    registrar_execucao()
+    df_base = montar_base(_df)
+    return df_base, IndiceDiario(df_base)
+
+
+@st.cache_resource(max_entries=4)
+def relatorio_em_cache(_df, versao):
+    """
+    Linhas da planilha que não seguem o esquema, uma vez por versão dos dados.
+    Data e agente só são cobrados das linhas fiscalizadas.
+    """
+    registrar_execucao()
+    return validar(_df, ESQUEMA_FISCALIZACAO, mascara=_df['Status'].isin(STATUS_FISCALIZADOS).to_numpy())
+
+
+def filtrar(df_base, indice, inicio, fim, agente='TODOS', status='TODOS', responsavel='TODOS'):
+    """
+    Aplica o período [inicio, fim] e os filtros categóricos ('TODOS' = sem filtro).
+    O período é uma fatia da base ordenada; só os filtros categóricos usam máscara.
+    """
+    i, j = indice.fatia(inicio, fim)
+    df_periodo = df_base.iloc[i:j]
+    mascara = None
+    for coluna, valor in (('Agente', agente), ('Status', status), ('Responsável', responsavel)):
+        if valor != 'TODOS':
+            condicao = df_periodo[coluna] == valor
+            mascara = condicao if mascara is None else mascara & condicao
+    return df_periodo if mascara is None else df_periodo[mascara]
+
+
+def contagens_periodo(df_filtrado, indice, data_inicio, data_fim, filtros_ativos):
+    """
+    Contagens exibidas na página. Sem filtros categóricos vêm do índice diário;
+    com eles, são calculadas sobre as linhas filtradas.
+    """
+    if not filtros_ativos:
+        return indice.contagens(data_inicio, data_fim)
+    return contar_linhas(df_filtrado)
+
+
+def evolucao(df_filtrado, indice, data_inicio, data_fim, frequencia, filtros_ativos):
+    """
+    Fiscalizações por dia/semana/mês, pelo mesmo critério de `contagens_periodo`.
+    """
+    if not filtros_ativos:
+        return indice.contagens_por_periodo(data_inicio, data_fim, frequencia)
+    return df_filtrado.resample(frequencia, on='Data da analise', label='left', closed='left').size()
@@ -0,0 +1,331 @@
+"""
+Camada única de acesso aos dados do Google Sheets, compartilhada pelas páginas.
+
+- Um único cliente gspread autorizado por processo.
+- Uma fonte pode juntar várias abas (de uma ou mais planilhas, p. ex. uma por
+  unidade ou mês). As abas são lidas em paralelo, então a atualização demora o
+  tempo da aba mais lenta, e não a soma de todas; o resultado ganha a coluna
+  categórica 'Origem'.
+- Cada fonte guarda um snapshot (DataFrame já preparado + versão, o hash do
+  conteúdo) que é trocado de uma só vez quando uma atualização traz dados
+  novos. Uma releitura sem mudanças mantém a versão e os caches das páginas.
+- Um atualizador em segundo plano relê as fontes registradas a cada intervalo,
+  então as páginas só leem o snapshot mais recente e nunca esperam pela API.
+  Se o atualizador não estiver rodando, um snapshot vencido (TTL) é renovado
+  em segundo plano enquanto os leitores recebem o anterior.
+- Uma fonte com `repositorio` guarda cada snapshot novo lido em segundo plano
+  no repositório local (`utils.repositorio`). Se a planilha não puder ser lida
+  na primeira vez (sem rede ou credenciais), a última versão guardada é usada.
+- Com vários processos do app, SOC_DADOS_COMPARTILHADOS=1 faz as fontes lerem
+  as bases publicadas em memória compartilhada por `publicar_bases.py`
+  (`utils.compartilhado`), em vez de cada processo ler o Sheets.
+- `exibir_status_atualizacao` mostra a idade dos dados e permite invalidá-los.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.instrumentacao import registrar_execucao
+
+ESCOPOS = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+# Tempo de validade padrão dos dados, em segundos
+TTL_PADRAO = int(os.environ.get("SOC_TTL_DADOS", "600"))
+
+# Intervalo entre as atualizações em segundo plano, em segundos
+INTERVALO_ATUALIZACAO = int(os.environ.get("SOC_INTERVALO_ATUALIZACAO", "300"))
+
+# Com "1", as fontes usam as bases publicadas por `publicar_bases.py` (utils/compartilhado.py)
+DADOS_COMPARTILHADOS = os.environ.get("SOC_DADOS_COMPARTILHADOS") == "1"
+
+# Máximo de abas lidas ao mesmo tempo por uma fonte
+MAX_LEITURAS = int(os.environ.get("SOC_LEITURAS_SIMULTANEAS", "8"))
+
+
+@st.cache_resource
+def obter_cliente():
+    """
+    Retorna o cliente gspread autorizado, criado uma única vez por processo.
+    """
+    # Importados aqui: gspread e google-auth pesam na partida do app e só são
+    # necessários quando alguma base do Sheets é lida
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=ESCOPOS)
+    return gspread.authorize(creds)
+
+
+class FonteDados:
+    """
+    Cache de uma ou mais abas do Google Sheets.
+
+    `abas` é uma função que recebe o cliente gspread e devolve o `Worksheet`, ou
+    um dicionário origem -> função, para juntar várias abas. Cada aba tem o seu
+    `SincronizadorPlanilha`, ao qual `preparar` é repassado para limpar as
+    linhas lidas. `repositorio` é o nome da base no repositório local (None =
+    não guardar). `intervalo_completo` (segundos) é o intervalo máximo entre
+    leituras completas, as únicas que enxergam edições acima da última linha;
+    abas editadas no lugar devem usar um valor próximo do `ttl`.
+    `ao_atualizar` (opcional) recebe cada DataFrame novo lido em segundo plano
+    (nunca durante a execução de uma página).
+    """
+
+    def __init__(self, nome, abas, preparar=None, ttl=TTL_PADRAO, repositorio=None, intervalo_completo=3600,
+                 ao_atualizar=None):
+        from utils.sincronizacao import SincronizadorPlanilha
+
+        self.nome = nome
+        self.abas = abas if isinstance(abas, dict) else {nome: abas}
+        self.ttl = ttl
+        self.repositorio = repositorio
+        self.ao_atualizar = ao_atualizar
+        self.sincronizadores = {origem: SincronizadorPlanilha(preparar=preparar, intervalo_completo=intervalo_completo) for origem in self.abas}
+        # DataFrames das abas usados na última junção e o resultado dela
+        self._juntados = (None, None)
+        # (DataFrame, versão); substituído inteiro só quando o conteúdo muda
+        self.snapshot = None
+        # Horário da última leitura bem-sucedida (idade e TTL)
+        self.lido_em = None
+        self.ultimo_erro = None
+        # Última versão guardada no repositório e último DataFrame passado a `ao_atualizar`
+        self._guardado = None
+        self._processado = None
+        # Mantido durante toda leitura da planilha: no máximo uma por vez, seja do
+        # atualizador, da primeira página ou de uma invalidação
+        self._lock = threading.Lock()
+
+    def _sincronizar_aba(self, origem, cliente):
+        return self.sincronizadores[origem].sincronizar(self.abas[origem](cliente))
+
+    def _juntar(self, frames):
+        """
+        Junta as abas com a coluna 'Origem'. Se nenhuma aba mudou, devolve o mesmo
+        DataFrame da junção anterior.
+        """
+        from utils.sincronizacao import juntar_com_origem
+
+        anteriores, juntado = self._juntados
+        if anteriores is None or any(frames[o] is not anteriores[o] for o in frames):
+            juntado = juntar_com_origem(frames)
+            self._juntados = (frames, juntado)
+        return juntado
+
+    def _carregar(self, cliente):
+        if len(self.abas) == 1:
+            df = self._sincronizar_aba(next(iter(self.abas)), cliente)
+        else:
+            # Uma thread por aba: as leituras são chamadas de rede, que liberam o GIL
+            with ThreadPoolExecutor(max_workers=min(len(self.abas), MAX_LEITURAS)) as executor:
+                futuros = {origem: executor.submit(self._sincronizar_aba, origem, cliente) for origem in self.abas}
+                df = self._juntar({origem: futuro.result() for origem, futuro in futuros.items()})
+        self._trocar_snapshot(df)
+        self.ultimo_erro = None
+        return self.snapshot
+
+    def _trocar_snapshot(self, df):
+        """
+        Registra uma leitura. A versão é o hash do conteúdo, recalculado só quando
+        o DataFrame é outro objeto; com o mesmo conteúdo, o snapshot não é trocado
+        e as páginas continuam usando os seus caches.
+        """
+        from utils.repositorio import hash_dados
+
+        anterior = self.snapshot
+        if anterior is None or df is not anterior[0]:
+            versao = hash_dados(df)
+            if anterior is None or versao != anterior[1]:
+                self.snapshot = (df, versao)
+        self.lido_em = time.time()
+
+    def _guardar(self, snapshot):
+        from utils.repositorio import salvar_versao
+
+        df, versao = snapshot
+        if versao != self._guardado:
+            salvar_versao(self.repositorio, df, origem=self.nome)
+            self._guardado = versao
+
+    def _carregar_do_repositorio(self, erro):
+        """
+        Usa a última versão guardada no repositório quando a planilha não pôde ser
+        lida. Retorna False se não houver versão guardada.
+        """
+        from utils.repositorio import abrir, versoes
+
+        if self.repositorio is None or not versoes(self.repositorio):
+            return False
+        df, _ = abrir(self.repositorio)
+        # O horário da leitura do repositório adia a próxima tentativa até o fim do TTL
+        self._trocar_snapshot(df)
+        self.ultimo_erro = erro
+        return True
+
+    def atualizar(self, cliente=None):
+        """
+        Relê a planilha e troca o snapshot (e o guarda no repositório, se houver).
+        Não faz nada se já houver uma leitura desta fonte em andamento.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            snapshot = self._carregar(cliente or obter_cliente())
+            if self.repositorio is not None:
+                self._guardar(snapshot)
+            if self.ao_atualizar is not None and snapshot[0] is not self._processado:
+                self.ao_atualizar(snapshot[0])
+                self._processado = snapshot[0]
+        except Exception as e:
+            # Mantém o snapshot antigo; uma nova tentativa ocorre no próximo ciclo
+            self.ultimo_erro = e
+        finally:
+            self._lock.release()
+
+    def idade(self):
+        """
+        Segundos desde a última leitura bem-sucedida (None se nunca foi lida).
+        """
+        lido_em = self.lido_em
+        return None if lido_em is None else time.time() - lido_em
+
+    def _obter_publicado(self):
+        from utils.compartilhado import PASTA_COMPARTILHADA, obter
+
+        publicado = obter(self.nome)
+        if publicado is None:
+            raise RuntimeError(f"A base '{self.nome}' ainda não foi publicada em '{PASTA_COMPARTILHADA}' (python publicar_bases.py).")
+        self.snapshot, self.lido_em = publicado
+        return self.snapshot
+
+    def obter_snapshot(self):
+        """
+        Retorna o snapshot atual (DataFrame, versão). Só bloqueia se a fonte ainda
+        não tiver sido lida (ou depois de uma invalidação). A versão (hash do
+        conteúdo) só muda quando os dados mudam.
+        """
+        if DADOS_COMPARTILHADOS:
+            return self._obter_publicado()
+        snapshot = self.snapshot
+        lido_em = self.lido_em
+        if snapshot is None:
+            # Se já houver uma leitura em andamento (p. ex. a do atualizador logo
+            # depois da partida), espera por ela em vez de buscar a planilha de novo
+            with self._lock:
+                if self.snapshot is None:
+                    registrar_execucao()
+                    try:
+                        self._carregar(obter_cliente())
+                    except Exception as e:
+                        if not self._carregar_do_repositorio(e):
+                            raise
+                snapshot, lido_em = self.snapshot, self.lido_em
+        # lido_em é None se outra sessão invalidou a fonte neste meio-tempo
+        if lido_em is not None and time.time() - lido_em >= self.ttl and not self._lock.locked():
+            threading.Thread(target=self.atualizar, daemon=True).start()
+        return snapshot
+
+    def obter(self):
+        """
+        Retorna o DataFrame do snapshot atual.
+        """
+        return self.obter_snapshot()[0]
+
+    def invalidar(self):
+        """
+        Descarta o snapshot; a próxima leitura busca a planilha inteira novamente.
+        Espera a leitura em andamento, se houver, terminar.
+        """
+        with self._lock:
+            self.snapshot = None
+            self.lido_em = None
+            for sincronizador in self.sincronizadores.values():
+                sincronizador.reiniciar()
+
+
+_fontes = {}
+_lock_registro = threading.Lock()
+
+
+def registrar_fonte(nome, abas, preparar=None, ttl=TTL_PADRAO, repositorio=None, intervalo_completo=3600,
+                    ao_atualizar=None):
+    """
+    Retorna a fonte `nome`, criando-a na primeira chamada. Todas as sessões do
+    processo compartilham a mesma instância.
+    """
+    with _lock_registro:
+        if nome not in _fontes:
+            _fontes[nome] = FonteDados(nome, abas, preparar=preparar, ttl=ttl, repositorio=repositorio,
+                                       intervalo_completo=intervalo_completo, ao_atualizar=ao_atualizar)
+        return _fontes[nome]
+
+
+def _laco_atualizacao(registrar, intervalo):
+    try:
+        if registrar is not None:
+            registrar()
+        cliente = obter_cliente()
+    except Exception:
+        # Sem credenciais válidas as páginas carregam sob demanda e exibem o erro
+        return
+    while True:
+        with _lock_registro:
+            fontes = list(_fontes.values())
+        for fonte in fontes:
+            fonte.atualizar(cliente)
+        time.sleep(intervalo)
+
+
+@st.cache_resource
+def iniciar_atualizador(_registrar=None, intervalo=INTERVALO_ATUALIZACAO):
+    """
+    Inicia (uma única vez por processo) a thread que mantém as fontes
+    registradas atualizadas. A primeira passada já pré-carrega todas elas.
+
+    `_registrar` (opcional) é chamada já dentro da thread, antes da primeira
+    passada, para registrar as fontes. Assim o registro, a autenticação e os
+    imports pesados que eles puxam (pandas, gspread) ficam fora do caminho da
+    primeira página.
+
+    Com bases compartilhadas quem atualiza é o `publicar_bases.py`, e nenhuma
+    thread é iniciada.
+    """
+    if DADOS_COMPARTILHADOS:
+        return None
+    thread = threading.Thread(target=_laco_atualizacao, args=(_registrar, intervalo), daemon=True, name="atualizador-fontes")
+    thread.start()
+    return thread
+
+
+def _formatar_idade(segundos):
+    if segundos < 60:
+        return "agora há pouco"
+    if segundos < 3600:
+        return f"há {int(segundos // 60)} min"
+    return f"há {segundos / 3600:.1f} h"
+
+
+def exibir_status_atualizacao(fonte):
+    """
+    Mostra na barra lateral a idade dos dados e um botão que força a releitura.
+    Com bases compartilhadas, o botão pede a releitura ao `publicar_bases.py`.
+    """
+    idade = fonte.idade()
+    if idade is not None:
+        st.sidebar.caption(f"Dados atualizados {_formatar_idade(idade)}")
+    if fonte.ultimo_erro is not None:
+        st.sidebar.caption(f"⚠️ Falha na última atualização: {fonte.ultimo_erro}")
+    if st.sidebar.button("🔄 Atualizar dados", key=f"atualizar_{fonte.nome}"):
+        if DADOS_COMPARTILHADOS:
+            from utils.compartilhado import pedir_atualizacao
+
+            pedir_atualizacao(fonte.nome)
+            st.sidebar.caption("Releitura pedida: os dados novos aparecem em alguns segundos.")
+        else:
+            fonte.invalidar()
+            st.rerun()
@@ -0,0 +1,132 @@
+"""
+Fábrica dos gráficos Plotly dos dashboards.
+
+Montar cada figura pelo Plotly Express custa dezenas de milissegundos por gráfico
+a cada rerun (inferência de colunas, template completo, validação de tudo), e
+devolver uma figura de `st.cache_data` custa quase o mesmo (desserialização).
+Aqui os layouts dos dois temas (padrão e "Formatação para Modo Claro") são
+montados uma vez, como dicionários, e cada figura só recebe os poucos valores
+agregados. As figuras ficam em `st.cache_resource` com os próprios valores na
+chave: o mesmo agregado, venha de qualquer filtro ou sessão, reaproveita a
+mesma figura (a chamada não copia nem desserializa nada).
+
+As funções recebem rótulos e valores como tuplas (veja `pares`).
+"""
+import copy
+
+import streamlit as st
+
+from utils.instrumentacao import registrar_execucao
+
+_FONTE_ALTO_CONTRASTE = {'weight': 'bold', 'color': 'black'}
+
+# Layout de cada tema, montado uma única vez
+LAYOUTS = {
+    False: {'xaxis': {}, 'yaxis': {}},
+    True: {
+        'xaxis': {'title': {'font': _FONTE_ALTO_CONTRASTE}, 'tickfont': _FONTE_ALTO_CONTRASTE},
+        'yaxis': {'title': {'font': _FONTE_ALTO_CONTRASTE}, 'tickfont': _FONTE_ALTO_CONTRASTE},
+    },
+}
+
+
+def pares(serie):
+    """
+    Rótulos e valores de uma série de contagens, como tuplas (chave de cache).
+    """
+    return tuple(serie.index), tuple(serie.to_numpy().tolist())
+
+
+def _marcador(cor):
+    """
+    Cor da série; sem cor definida, fica a sequência de cores do tema do Streamlit.
+    """
+    return {} if cor is None else {'marker': {'color': cor}}
+
+
+def _layout(titulo, alto_contraste, rotulo_x=None, rotulo_y=None, **extras):
+    """
+    Copia o layout do tema e preenche título, nomes dos eixos e ajustes do gráfico.
+    """
+    layout = copy.deepcopy(LAYOUTS[alto_contraste])
+    layout['title'] = {'text': titulo}
+    layout['xaxis'].setdefault('title', {})['text'] = rotulo_x
+    layout['yaxis'].setdefault('title', {})['text'] = rotulo_y
+    for chave, valor in extras.items():
+        if isinstance(valor, dict):
+            layout.setdefault(chave, {}).update(valor)
+        else:
+            layout[chave] = valor
+    return layout
+
+
+def _dica(rotulo_x, rotulo_y):
+    return f"{rotulo_x}=%{{x}}<br>{rotulo_y}=%{{y}}<extra></extra>"
+
+
+def _figura(dados, layout):
+    import plotly.graph_objects as go  # só carregado quando há gráfico a montar
+
+    return go.Figure({'data': dados, 'layout': layout})
+
+
+@st.cache_resource(max_entries=256)
+def figura_barras(rotulos, valores, titulo, rotulo_x, rotulo_y, cores=None, horizontal=False, texto_fora=True, alto_contraste=False):
+    """
+    Barras simples com o valor de cada barra (do lado de fora, com folga no eixo, se
+    `texto_fora`). `cores` ({categoria: cor}) gera uma série por categoria;
+    `horizontal` ordena da maior para a menor, de cima para baixo.
+    """
+    registrar_execucao()
+    eixo_categorias, eixo_valores = ('y', 'x') if horizontal else ('x', 'y')
+    rotulos_eixos = {eixo_categorias: rotulo_x, eixo_valores: rotulo_y}
+    dica = _dica(rotulos_eixos['x'], rotulos_eixos['y'])
+
+    def barra(categorias, quantidades, **extras):
+        return dict({'type': 'bar', eixo_categorias: list(categorias), eixo_valores: list(quantidades),
+                     'text': list(quantidades), 'hovertemplate': dica, 'orientation': 'h' if horizontal else 'v'},
+                    textposition='outside' if texto_fora else 'auto', **extras)
+
+    if cores is None:
+        dados = [barra(rotulos, valores)]
+    else:
+        dados = [barra([r], [v], name=str(r), **_marcador(cores.get(r))) for r, v in zip(rotulos, valores)]
+
+    extras = {'showlegend': False, 'barmode': 'relative'}
+    if texto_fora:
+        extras[f'{eixo_valores}axis'] = {'range': [0, max(valores, default=0) * 1.15]}
+    if horizontal:
+        extras['yaxis'] = {'categoryorder': 'total ascending'}
+    layout = _layout(titulo, alto_contraste, rotulos_eixos['x'], rotulos_eixos['y'], **extras)
+    return _figura(dados, layout)
+
+
+@st.cache_resource(max_entries=256)
+def figura_barras_agrupadas(rotulos, series, titulo, rotulo_y, rotulo_legenda, cores=None, alto_contraste=False):
+    """
+    Barras agrupadas: `series` é uma tupla de (nome, valores), uma barra de cada por rótulo.
+    """
+    registrar_execucao()
+    cores = cores or {}
+    dica = f"{rotulo_legenda}=%{{fullData.name}}<br>%{{x}}<br>{rotulo_y}=%{{y}}<extra></extra>"
+    dados = [
+        dict({'type': 'bar', 'name': nome, 'x': list(rotulos), 'y': list(valores), 'text': list(valores),
+              'hovertemplate': dica}, **_marcador(cores.get(nome)))
+        for nome, valores in series
+    ]
+    layout = _layout(titulo, alto_contraste, None, rotulo_y, barmode='group', legend={'title': {'text': rotulo_legenda}})
+    return _figura(dados, layout)
+
+
+@st.cache_resource(max_entries=256)
+def figura_pizza(rotulos, valores, titulo, cores=None, buraco=0):
+    """
+    Pizza (ou rosca, com `buraco` > 0) com percentual e rótulo em cada fatia.
+    As fatias fora de `cores` ({rótulo: cor}) ficam com as cores do tema.
+    """
+    registrar_execucao()
+    dados = [{'type': 'pie', 'labels': list(rotulos), 'values': list(valores), 'hole': buraco, 'textinfo': 'percent+label'}]
+    if cores and any(r in cores for r in rotulos):
+        # Cor None: o Plotly usa a próxima cor do tema para a fatia
+        dados[0]['marker'] = {'colors': [cores.get(r) for r in rotulos]}
+    return _figura(dados, {'title': {'text': titulo}})
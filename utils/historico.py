@@ -0,0 +1,184 @@
+"""
+Histórico mensal da produção, guardado como contagens agregadas.
+
+Quando um mês fecha, o cubo de contagens da base (Setor, Código Equipe,
+Resultado) é gravado com a coluna 'Mês' na base `historico_producao` do
+repositório local. São no máximo algumas centenas de linhas por mês, então a
+tendência e as comparações entre meses leem só essas contagens e custam o mesmo
+seja qual for o volume de linhas das planilhas originais.
+
+O histórico é gravado fora das páginas: a cada versão nova da produção mensal
+lida em segundo plano (pelo atualizador do app ou, com bases compartilhadas,
+pelo `publicar_bases.py`), o mês anterior é fechado se ainda não estiver no
+histórico; um mês fechado nunca é sobrescrito. Meses podem ser incluídos ou
+refeitos com `python converter_base.py planilha.xlsx --mes AAAA-MM`. As páginas
+apenas leem o histórico, uma vez por versão dele.
+"""
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from utils.cubo import DIMENSOES, filtrar_cubo, montar_cubo
+from utils.graficos import figura_barras_agrupadas
+from utils.instrumentacao import registrar_execucao
+from utils.painel_producao import CORES_RESULTADO
+from utils.repositorio import abrir, salvar_versao, versoes
+
+NOME_HISTORICO = "historico_producao"
+
+# Quantidade de meses exibidos no gráfico e na tabela de comparação
+MESES_EXIBIDOS = 12
+
+
+def ultima_versao_historico():
+    """
+    Versão atual do histórico (0 se ainda não houver nenhum mês fechado).
+    """
+    lista = versoes(NOME_HISTORICO)
+    return lista[-1]["versao"] if lista else 0
+
+
+def carregar_historico(versao=None):
+    """
+    Contagens de todos os meses fechados (DataFrame vazio se ainda não houver) e a versão.
+    """
+    if versao == 0 or not versoes(NOME_HISTORICO):
+        return pd.DataFrame(columns=['Mês'] + DIMENSOES + ['Contagem']), 0
+    return abrir(NOME_HISTORICO, versao)
+
+
+def _dimensoes_como_texto(cubo):
+    """
+    Contagens com as dimensões como texto (vazios continuam vazios), ordenadas.
+    """
+    cubo = cubo[DIMENSOES + ['Contagem']].copy()
+    for col in DIMENSOES:
+        cubo[col] = cubo[col].astype(str).where(cubo[col].notna())
+    return cubo.sort_values(DIMENSOES, ignore_index=True)
+
+
+def mes_anterior(hoje=None):
+    """
+    Mês anterior a `hoje` (padrão: data atual) no formato 'AAAA-MM'.
+    """
+    hoje = hoje or date.today()
+    return (hoje.replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+
+
+def fechar_mes(cubo, mes, substituir=False):
+    """
+    Grava as contagens do mês `mes` ('AAAA-MM') no histórico e retorna a versão
+    do histórico. Um mês já fechado só é regravado com `substituir`. Se as
+    contagens forem idênticas às do último mês gravado, a base ainda não foi
+    trocada e o mês não é fechado.
+    """
+    historico, versao = carregar_historico()
+    meses = historico['Mês'].astype(str)
+    if not substituir and (meses == mes).any():
+        return versao
+
+    cubo = _dimensoes_como_texto(cubo)
+    anteriores = meses[meses < mes]
+    if not anteriores.empty:
+        if _dimensoes_como_texto(historico[meses == anteriores.max()]).equals(cubo):
+            return versao
+
+    novo = pd.concat([historico[meses != mes].astype({'Mês': str}), cubo.assign(**{'Mês': mes})], ignore_index=True)
+    novo = novo[['Mês'] + DIMENSOES + ['Contagem']].sort_values(['Mês'] + DIMENSOES, ignore_index=True)
+    novo = novo.astype({col: 'category' for col in ['Mês'] + DIMENSOES} | {'Contagem': 'int64'})
+    return salvar_versao(NOME_HISTORICO, novo, origem=f"fechamento {mes}")
+
+
+def fechar_mes_da_base(df, mes, substituir=False):
+    """
+    Fecha o mês `mes` a partir da base de produção completa.
+    """
+    return fechar_mes(montar_cubo(df), mes, substituir)
+
+
+@st.cache_resource(max_entries=4)
+def historico_em_cache(versao):
+    """
+    Histórico (DataFrame, versão), lido uma única vez por versão do histórico.
+    """
+    registrar_execucao()
+    return carregar_historico(versao)
+
+
+@st.cache_data(max_entries=64)
+def resumo_mensal(_historico, versao_historico, chave):
+    """
+    Totais por mês (Total, PRODUTIVO, IMPRODUTIVO, Taxa %) com os filtros globais aplicados.
+    """
+    registrar_execucao()
+    historico = filtrar_cubo(_historico, dict(chave))
+    resumo = historico.pivot_table(index='Mês', columns='Resultado', values='Contagem', aggfunc='sum', fill_value=0, observed=True)
+    resumo = resumo.reindex(columns=pd.Index(['PRODUTIVO', 'IMPRODUTIVO'], name=None), fill_value=0)
+    resumo.index = resumo.index.astype(str)
+    resumo['Total'] = historico.groupby('Mês', observed=True)['Contagem'].sum()
+    resumo['Taxa (%)'] = (resumo['PRODUTIVO'] / resumo['Total'] * 100).round(2)
+    return resumo.tail(MESES_EXIBIDOS)
+
+
+@st.cache_data(max_entries=64)
+def comparativo_mensal(_historico, versao_historico, chave, dimensao):
+    """
+    Total de atividades de cada valor de `dimensao` (linhas) por mês (colunas).
+    """
+    registrar_execucao()
+    historico = filtrar_cubo(_historico, dict(chave))
+    meses = sorted(historico['Mês'].unique())[-MESES_EXIBIDOS:]
+    historico = historico[historico['Mês'].isin(meses)]
+    comparativo = historico.pivot_table(index=dimensao, columns='Mês', values='Contagem', aggfunc='sum', fill_value=0, observed=True)
+    # Rótulos como texto simples: índices categóricos não passam bem pelo Arrow do st.dataframe
+    comparativo.columns = comparativo.columns.astype(str)
+    comparativo.index = comparativo.index.astype(str)
+    return comparativo
+
+
+def exibir_historico(chave, medidor):
+    """
+    Tendência mês a mês e comparação com o mês anterior, a partir do histórico.
+    `chave` são os filtros globais da página (veja `exibir_painel_producao`).
+    """
+    st.markdown("---")
+    st.subheader("Histórico Mensal")
+
+    # Só o manifesto é lido a cada rerun; o mês fechado em segundo plano aparece
+    # assim que é gravado
+    historico, versao_historico = historico_em_cache(ultima_versao_historico())
+    medidor.marcar('historico', linhas=len(historico), em_cache=True)
+    if historico.empty:
+        st.info("Nenhum mês fechado no histórico ainda.")
+        return
+
+    resumo = resumo_mensal(historico, versao_historico, chave)
+    medidor.marcar('agregacao', em_cache=True)
+    if resumo.empty:
+        st.warning("Nenhum dado para exibir com os filtros atuais.")
+        return
+
+    # Último mês do histórico comparado com o anterior
+    atual = resumo.iloc[-1]
+    anterior = resumo.iloc[-2] if len(resumo) > 1 else None
+    kpi1, kpi2, kpi3 = st.columns(3)
+    kpi1.metric(f"Total de Atividades ({resumo.index[-1]})", f"{int(atual['Total'])}",
+                delta=None if anterior is None else int(atual['Total'] - anterior['Total']))
+    kpi2.metric("Total Produtivo", f"{int(atual['PRODUTIVO'])}",
+                delta=None if anterior is None else int(atual['PRODUTIVO'] - anterior['PRODUTIVO']))
+    kpi3.metric("Taxa de Produtividade", f"{atual['Taxa (%)']:.2f}%",
+                delta=None if anterior is None else f"{atual['Taxa (%)'] - anterior['Taxa (%)']:.2f} p.p.")
+
+    series = tuple((resultado, tuple(resumo[resultado].tolist())) for resultado in ['PRODUTIVO', 'IMPRODUTIVO'])
+    fig = figura_barras_agrupadas(tuple(resumo.index), series, "Produção por Mês", "Qtd. Atividades", "Resultado", cores=CORES_RESULTADO)
+    medidor.marcar('figuras', em_cache=True)
+    st.plotly_chart(fig, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(resumo[['Total', 'PRODUTIVO', 'IMPRODUTIVO', 'Taxa (%)']])
+    with col2:
+        dimensao = st.radio("Comparar por", ['Setor', 'Código Equipe'], horizontal=True, key='dimensao_historico')
+        st.dataframe(comparativo_mensal(historico, versao_historico, chave, dimensao))
+    medidor.marcar('render')
@@ -0,0 +1,76 @@
+"""
+Imagens estáticas (banner) preparadas uma única vez por processo.
+
+Passar um `PIL.Image` para `st.image` faz o Streamlit decodificar e recodificar
+a imagem (JPEG com qualidade 100) a cada rerun. Aqui a imagem é redimensionada
+para a largura máxima de exibição e recodificada uma vez só:
+
+- com `server.enableStaticServing` ligado (.streamlit/config.toml), é gravada
+  em WebP na pasta `static/` e exibida pela URL /app/static/..., que o
+  navegador guarda em cache;
+- sem o servidor estático, é guardada em memória como JPEG otimizado, que o
+  `st.image` envia sem recodificar.
+"""
+import io
+import os
+from pathlib import Path
+
+import streamlit as st
+from PIL import Image
+
+BANNER = "imagens/ceneged_cover.jpeg"
+
+# Pasta servida pelo Streamlit em /app/static (ao lado do dashboard.py)
+PASTA_ESTATICA = Path(__file__).resolve().parent.parent / "static"
+
+# Largura máxima do conteúdo no layout "wide" do Streamlit
+LARGURA_MAXIMA = 1460
+
+
+def _redimensionar(imagem, largura):
+    if imagem.width <= largura:
+        return imagem
+    altura = round(imagem.height * largura / imagem.width)
+    return imagem.resize((largura, altura), Image.LANCZOS)
+
+
+def _gravar_webp(imagem, origem):
+    """
+    Grava a versão WebP na pasta estática (só se ainda não existir) e retorna a URL.
+    """
+    nome = f"{Path(origem).stem}-{imagem.width}-{int(os.path.getmtime(origem))}.webp"
+    destino = PASTA_ESTATICA / nome
+    if not destino.exists():
+        PASTA_ESTATICA.mkdir(exist_ok=True)
+        temporario = destino.with_suffix(f".{os.getpid()}.tmp")
+        imagem.save(temporario, "WEBP", quality=80, method=6)
+        os.replace(temporario, destino)
+    return f"/app/static/{nome}"
+
+
+@st.cache_resource
+def imagem_otimizada(caminho, largura=LARGURA_MAXIMA):
+    """
+    Retorna a imagem pronta para o `st.image`: a URL estática do WebP ou os
+    bytes de um JPEG otimizado.
+    """
+    with Image.open(caminho) as original:
+        imagem = _redimensionar(original.convert("RGB"), largura)
+
+    if st.get_option("server.enableStaticServing"):
+        try:
+            return _gravar_webp(imagem, caminho)
+        except OSError:
+            # Sem permissão de escrita: cai para a imagem em memória
+            pass
+
+    buffer = io.BytesIO()
+    imagem.save(buffer, "JPEG", quality=85, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def exibir_banner(caminho=BANNER):
+    """
+    Exibe o banner no topo da página sem processar a imagem a cada rerun.
+    """
+    st.image(imagem_otimizada(caminho), use_container_width=True)
@@ -0,0 +1,65 @@
+"""
+Índice invertido em bitmaps para os filtros globais das páginas de produção.
+
+Para cada valor de cada coluna filtrável guarda um bitmap compactado (1 bit por
+linha) das linhas que têm aquele valor. Uma combinação de filtros vira OR entre
+os valores escolhidos de uma coluna e AND entre colunas, sem percorrer o
+DataFrame nem copiá-lo. O índice é somente leitura e compartilhado por todas as
+sessões.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.instrumentacao import registrar_execucao
+
+
+class IndiceBitmap:
+    """
+    Bitmaps {coluna: {valor: bits}} das colunas indicadas do DataFrame.
+    """
+
+    def __init__(self, df, colunas):
+        self.total_linhas = len(df)
+        self.bitmaps = {}
+        for col in colunas:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                codigos, valores = df[col].cat.codes.to_numpy(), df[col].cat.categories
+            else:
+                codigos, valores = pd.factorize(df[col])
+            self.bitmaps[col] = {valor: np.packbits(codigos == i) for i, valor in enumerate(valores)}
+
+    def mascara(self, filtros):
+        """
+        Bitmap das linhas que atendem aos filtros {coluna: valores}; `None` (no
+        filtro ou como retorno) significa "todas as linhas".
+        """
+        resultado = None
+        for col, valores in filtros.items():
+            if valores is None:
+                continue
+            bitmaps = self.bitmaps[col]
+            uniao = np.zeros((self.total_linhas + 7) // 8, dtype=np.uint8)
+            for valor in valores:
+                if valor in bitmaps:
+                    np.bitwise_or(uniao, bitmaps[valor], out=uniao)
+            resultado = uniao if resultado is None else np.bitwise_and(resultado, uniao, out=resultado)
+        return resultado
+
+    def posicoes(self, filtros):
+        """
+        Posições (iloc) das linhas selecionadas, ou `None` se não houver filtro.
+        """
+        mascara = self.mascara(filtros)
+        if mascara is None:
+            return None
+        return np.flatnonzero(np.unpackbits(mascara, count=self.total_linhas))
+
+
+@st.cache_resource(max_entries=8)
+def indice_em_cache(_df, versao, colunas=('Setor', 'Código Equipe', 'Resultado')):
+    """
+    Monta o índice uma vez por versão dos dados; a mesma instância atende todas as sessões.
+    """
+    registrar_execucao()
+    return IndiceBitmap(_df, colunas)
@@ -0,0 +1,183 @@
+"""
+Medição do tempo gasto em cada etapa de um rerun das páginas.
+
+A página cria um medidor no início e marca o fim de cada etapa
+(`medidor.marcar('filtro', linhas=...)`); cada marca soma o tempo decorrido
+desde a anterior àquela etapa. Funções em cache chamam `registrar_execucao()`
+no corpo: se a função rodou, a etapa é registrada como "miss", senão como "hit".
+
+Fica desligada por padrão. Liga com a variável de ambiente SOC_INSTRUMENTACAO=1
+ou com `?debug=1` na URL. Desligada, o medidor é um objeto que não faz nada.
+Ligada, cada rerun (e cada rerun só de um fragmento, com `medir_fragmento`):
+
+- aparece num painel "⏱️ Diagnóstico" na barra lateral (com histórico da sessão);
+- vai para o log `soc.instrumentacao` (nível INFO, na saída de erro) como uma linha JSON;
+- é acrescentado ao arquivo JSONL indicado em SOC_ARQUIVO_METRICAS, se houver.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+
+ARQUIVO_METRICAS = os.environ.get("SOC_ARQUIVO_METRICAS")
+
+# Quantidade de reruns guardados no histórico de cada sessão
+TAMANHO_HISTORICO = 20
+
+logger = logging.getLogger("soc.instrumentacao")
+if not logger.handlers:
+    # O logger raiz fica em WARNING e sem handler: sem isto as linhas INFO se perdem
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_local = threading.local()
+_lock_arquivo = threading.Lock()
+
+
+def instrumentacao_ativa():
+    """
+    Indica se a instrumentação foi ligada (variável de ambiente ou `?debug=1`).
+    """
+    if os.environ.get("SOC_INSTRUMENTACAO", "").lower() in ("1", "true", "sim"):
+        return True
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        # Fora de uma sessão do Streamlit (scripts, benchmarks)
+        return False
+
+
+class _MedidorDesligado:
+    """
+    Medidor usado com a instrumentação desligada: todas as chamadas são ignoradas.
+    """
+
+    def marcar(self, etapa, linhas=None, em_cache=False):
+        pass
+
+    def registrar_execucao(self):
+        pass
+
+    def finalizar(self, painel=True):
+        pass
+
+
+_DESLIGADO = _MedidorDesligado()
+
+
+class Medidor:
+    """
+    Tempos (ms), linhas e hit/miss de cache de cada etapa de um rerun.
+    """
+
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.etapas = {}
+        self.inicio = self._ultima_marca = time.perf_counter()
+        self._executou = False
+        self.finalizado = False
+
+    def marcar(self, etapa, linhas=None, em_cache=False):
+        """
+        Fecha a etapa `etapa`, somando a ela o tempo desde a última marca.
+        `em_cache` indica que a etapa chamou uma função em cache.
+        """
+        agora = time.perf_counter()
+        registro = self.etapas.setdefault(etapa, {'etapa': etapa, 'ms': 0.0})
+        registro['ms'] += (agora - self._ultima_marca) * 1000
+        if linhas is not None:
+            registro['linhas'] = int(linhas)
+        if em_cache:
+            # Etapa marcada mais de uma vez: basta uma execução para contar como "miss"
+            registro['cache'] = 'miss' if self._executou or registro.get('cache') == 'miss' else 'hit'
+        self._executou = False
+        self._ultima_marca = agora
+
+    def registrar_execucao(self):
+        self._executou = True
+
+    def resumo(self):
+        """
+        Registro do rerun no formato exportado (log, arquivo e painel).
+        """
+        etapas = [dict(e, ms=round(e['ms'], 2)) for e in self.etapas.values()]
+        return {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'pagina': self.pagina,
+            'total_ms': round((time.perf_counter() - self.inicio) * 1000, 2),
+            'etapas': etapas,
+        }
+
+    def finalizar(self, painel=True):
+        """
+        Exporta as medições do rerun e mostra o painel de diagnóstico
+        (`painel=False` num fragmento, que não pode escrever na barra lateral).
+        """
+        self.finalizado = True
+        registro = self.resumo()
+        logger.info(json.dumps(registro, ensure_ascii=False))
+        if ARQUIVO_METRICAS:
+            with _lock_arquivo, open(ARQUIVO_METRICAS, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+        historico = st.session_state.setdefault('_historico_instrumentacao', [])
+        historico.append(registro)
+        del historico[:-TAMANHO_HISTORICO]
+        if painel:
+            _exibir_painel(registro, historico)
+
+
+def _exibir_painel(registro, historico):
+    import pandas as pd  # só com a instrumentação ligada
+
+    with st.sidebar.expander("⏱️ Diagnóstico"):
+        st.caption(f"{registro['pagina']}: {registro['total_ms']:.0f} ms neste rerun")
+        st.dataframe(pd.DataFrame(registro['etapas']).set_index('etapa'))
+        st.download_button(
+            "Baixar medições da sessão (JSONL)",
+            "\n".join(json.dumps(r, ensure_ascii=False) for r in historico),
+            file_name="medicoes.jsonl",
+            mime="application/json"
+        )
+
+
+def iniciar_medicao(pagina):
+    """
+    Retorna o medidor deste rerun (um medidor vazio se a instrumentação estiver desligada).
+    """
+    medidor = Medidor(pagina) if instrumentacao_ativa() else _DESLIGADO
+    _local.medidor = medidor
+    return medidor
+
+
+@contextmanager
+def medir_fragmento(medidor, nome):
+    """
+    Medidor do corpo de um fragmento (`st.fragment`). Na execução da página
+    inteira é o `medidor` da página; quando só o fragmento é reexecutado, o da
+    página já foi finalizado, e o fragmento cria e finaliza um medidor próprio.
+    """
+    if not isinstance(medidor, Medidor) or not medidor.finalizado:
+        yield medidor
+        return
+    proprio = iniciar_medicao(f"{medidor.pagina} · {nome}")
+    try:
+        yield proprio
+    finally:
+        _local.medidor = _DESLIGADO
+    proprio.finalizar(painel=False)
+
+
+def registrar_execucao():
+    """
+    Chamada no corpo das funções em cache: marca a etapa atual como "miss".
+    """
+    getattr(_local, 'medidor', _DESLIGADO).registrar_execucao()
@@ -0,0 +1,47 @@
+"""
+Padronização das colunas de texto.
+
+Em vez de aplicar strip/upper/regex linha a linha, cada coluna é fatorada: os
+valores distintos são padronizados uma única vez e os códigos de cada linha são
+apenas remapeados. O custo passa a depender da quantidade de valores distintos,
+não do número de linhas, e o resultado já sai como `category`.
+"""
+import pandas as pd
+
+COLUNAS_PRODUCAO = ['Setor', 'Código Equipe', 'Resultado', 'Serviço', 'Tipo Operação']
+
+
+def normalizar_texto(serie, colapsar_espacos=True):
+    """
+    Retorna a série como categoria, sem espaços nas pontas, em maiúsculas e, se
+    `colapsar_espacos`, com espaços internos repetidos reduzidos a um só.
+    """
+    codigos, valores = pd.factorize(serie, use_na_sentinel=False)
+
+    # Números inteiros lidos como float (coluna numérica com células vazias) viram
+    # "101", e não "101.0": o mesmo código sai igual em qualquer bloco da planilha
+    valores = [int(valor) if isinstance(valor, float) and valor.is_integer() else valor for valor in valores]
+
+    # Padroniza apenas o dicionário de valores distintos
+    valores = pd.Series(valores, dtype=object).astype(str).str.strip()
+    if colapsar_espacos:
+        valores = valores.str.replace(r'\s+', ' ', regex=True)
+    valores = valores.str.upper()
+
+    # Valores diferentes podem virar o mesmo texto (" a" e "A"): refatora o dicionário
+    codigos_dicionario, categorias = pd.factorize(valores)
+    return pd.Series(
+        pd.Categorical.from_codes(codigos_dicionario[codigos], categories=categorias),
+        index=serie.index,
+        name=serie.name
+    )
+
+
+def normalizar_colunas(df, colunas, colapsar_espacos=True):
+    """
+    Aplica `normalizar_texto` às colunas de `colunas` presentes no DataFrame.
+    """
+    for col in colunas:
+        if col in df.columns:
+            df[col] = normalizar_texto(df[col], colapsar_espacos=colapsar_espacos)
+    return df
@@ -0,0 +1,258 @@
+"""
+Corpo comum das páginas de Produção Diária e Produção Mensal.
+
+As duas páginas só diferem na origem dos dados (upload ou Google Sheets); filtros,
+KPIs, gráficos e tabelas de resumo são montados aqui. Tudo o que é derivado do
+cubo de contagens fica em cache, com chave (versão dos dados, estado dos
+filtros[, seleção do gráfico]). Assim, um rerun provocado por um widget só
+recalcula o que depende dele: trocar a equipe do gráfico refaz apenas esse
+gráfico, e voltar a uma combinação de filtros já vista não recalcula nada. As
+figuras saem da fábrica de `utils.graficos`, em cache pelos valores agregados.
+
+Os gráficos com filtro próprio são fragmentos (`st.fragment`): mudar a seleção
+de um deles reexecuta só aquele painel, e não a página inteira.
+
+As planilhas enviadas na Produção Diária ficam em `planilhas_em_cache`, com
+chave nos ids dos arquivos: um rerun não lê nem calcula o hash do conteúdo
+enviado, e todas as sessões recebem o mesmo DataFrame, sem cópia.
+"""
+import streamlit as st
+
+from utils.cubo import DIMENSOES, contagem_por, contar, cubo_em_cache, filtrar_cubo, tabela_contagens, valores
+from utils.graficos import figura_barras_agrupadas, figura_pizza, pares
+from utils.indice import indice_em_cache
+from utils.instrumentacao import medir_fragmento, registrar_execucao
+from utils.tabela import exibir_tabela_paginada
+
+CORES_RESULTADO = {'PRODUTIVO': 'royalblue', 'IMPRODUTIVO': 'darkorange'}
+
+
+@st.cache_resource(max_entries=4)
+def planilhas_em_cache(versao, _arquivos, _preparar):
+    """
+    DataFrame das planilhas enviadas (`versao` = ids dos arquivos), preparado
+    por `_preparar`. É compartilhado entre as sessões e não deve ser alterado.
+    """
+    registrar_execucao()
+    # Importado aqui para que openpyxl/Parquet só carreguem quando há upload
+    from utils.cache_planilhas import carregar_varios_excel
+
+    # Cada planilha é convertida para Parquet uma única vez (várias ao mesmo
+    # tempo, em processos separados); os próximos envios do mesmo arquivo
+    # são lidos direto do cache em disco.
+    return carregar_varios_excel(_arquivos, _preparar)
+
+
+def _chave_filtros(filtros):
+    """
+    Filtros {coluna: valores ou None} num formato que pode ser usado como chave de cache.
+    """
+    return tuple((coluna, None if selecionados is None else tuple(selecionados)) for coluna, selecionados in filtros.items())
+
+
+@st.cache_data(max_entries=16)
+def opcoes_filtros(_cubo, versao):
+    """
+    Valores disponíveis em cada filtro global.
+    """
+    registrar_execucao()
+    return {coluna: valores(_cubo, coluna) for coluna in DIMENSOES}
+
+
+@st.cache_data(max_entries=256)
+def resumo_filtros(_cubo, versao, chave):
+    """
+    KPIs e opções dos filtros individuais dos gráficos para um estado dos filtros globais.
+    """
+    registrar_execucao()
+    cubo = filtrar_cubo(_cubo, dict(chave))
+    total = contar(cubo)
+    produtivo = contar(cubo, 'Resultado', 'PRODUTIVO')
+    return {
+        'vazio': cubo.empty,
+        'total': total,
+        'produtivo': produtivo,
+        'improdutivo': contar(cubo, 'Resultado', 'IMPRODUTIVO'),
+        'taxa': (produtivo / total * 100) if total > 0 else 0,
+        'equipes': valores(cubo, 'Código Equipe'),
+        'setores': valores(cubo, 'Setor'),
+    }
+
+
+@st.cache_data(max_entries=256)
+def dados_equipes(_cubo, versao, chave, equipe):
+    """
+    Contagens por equipe e resultado do gráfico de barras ('TODAS AS EQUIPES' = sem
+    seleção), no formato da fábrica de gráficos: (equipes, ((resultado, valores), ...)).
+    """
+    registrar_execucao()
+    cubo = filtrar_cubo(_cubo, dict(chave))
+    if equipe != 'TODAS AS EQUIPES':
+        cubo = cubo[cubo['Código Equipe'] == equipe]
+
+    produtividade_equipe = tabela_contagens(cubo, 'Código Equipe')
+    series = tuple((resultado, tuple(produtividade_equipe[resultado].tolist())) for resultado in produtividade_equipe.columns)
+    return tuple(produtividade_equipe.index), series
+
+
+@st.cache_data(max_entries=256)
+def dados_setores(_cubo, versao, chave, setor):
+    """
+    Contagens por resultado do gráfico de pizza de um setor ('TODOS OS SETORES' = sem seleção).
+    """
+    registrar_execucao()
+    cubo = filtrar_cubo(_cubo, dict(chave))
+    if setor != 'TODOS OS SETORES':
+        cubo = cubo[cubo['Setor'] == setor]
+    return pares(contagem_por(cubo, 'Resultado'))
+
+
+def _com_totais(resumo):
+    if 'PRODUTIVO' not in resumo: resumo['PRODUTIVO'] = 0
+    if 'IMPRODUTIVO' not in resumo: resumo['IMPRODUTIVO'] = 0
+    resumo['Total Geral'] = resumo.sum(axis=1)
+    return resumo
+
+
+@st.cache_data(max_entries=256)
+def tabelas_resumo(_cubo, versao, chave):
+    """
+    Tabelas de resumo por equipe e por serviço (setor), com a linha de total geral.
+    """
+    registrar_execucao()
+    cubo = filtrar_cubo(_cubo, dict(chave))
+    resumo_equipe = _com_totais(tabela_contagens(cubo, ['Código Equipe']))
+    resumo_servico = _com_totais(tabela_contagens(cubo, ['Setor']))
+    total_geral_servico = resumo_servico.sum().to_frame('Total Geral').T
+    return resumo_equipe, resumo_servico, total_geral_servico
+
+
+@st.fragment
+def _grafico_equipes(cubo, versao, chave, equipes, medidor):
+    lista_equipes_grafico = ['TODAS AS EQUIPES'] + equipes
+    equipe_selecionada_grafico = st.selectbox('Detalhar por Equipe:', options=lista_equipes_grafico, key='select_equipe_individual')
+
+    with medir_fragmento(medidor, 'Equipe') as medidor:
+        equipes_grafico, series = dados_equipes(cubo, versao, chave, equipe_selecionada_grafico)
+        fig = figura_barras_agrupadas(equipes_grafico, series, "Produtividade por Equipe", "Qtd. Atividades", "Resultado", cores=CORES_RESULTADO)
+        medidor.marcar('figuras', em_cache=True)
+        st.plotly_chart(fig, use_container_width=True)
+        medidor.marcar('render')
+
+
+@st.fragment
+def _grafico_setores(cubo, versao, chave, setores, medidor):
+    lista_setores_grafico = ['TODOS OS SETORES'] + setores
+    setor_selecionado_grafico = st.selectbox('Detalhar por Setor:', options=lista_setores_grafico, key='select_setor_individual')
+
+    titulo_grafico = f'Produtividade para: {setor_selecionado_grafico}' if setor_selecionado_grafico != 'TODOS OS SETORES' else 'Produtividade (Todos os Setores Filtrados)'
+    with medir_fragmento(medidor, 'Setor') as medidor:
+        resultados, contagens = dados_setores(cubo, versao, chave, setor_selecionado_grafico)
+        fig = figura_pizza(resultados, contagens, titulo_grafico, cores=CORES_RESULTADO)
+        medidor.marcar('figuras', em_cache=True)
+        st.plotly_chart(fig, use_container_width=True)
+        medidor.marcar('render')
+
+
+def exibir_painel_producao(df_original, versao, medidor):
+    """
+    Desenha filtros globais, tabela de dados, KPIs, gráficos e resumos de uma base
+    de produção. `versao` identifica os dados (ids do upload, hash do conteúdo).
+    Retorna os filtros globais escolhidos, no formato usado como chave de cache.
+    """
+    cubo = cubo_em_cache(df_original, versao)
+    indice = indice_em_cache(df_original, versao)
+    medidor.marcar('indexacao', em_cache=True)
+
+    # --- FILTROS GLOBAIS NA BARRA LATERAL ---
+    opcoes = opcoes_filtros(cubo, versao)
+    st.sidebar.header("Filtros Globais")
+
+    # Filtro por Setor
+    setores_disponiveis = ['TODOS'] + opcoes['Setor']
+    setores_selecionados = st.sidebar.multiselect("Setor", setores_disponiveis, default=['TODOS'])
+
+    # Filtro por Equipe
+    equipes_disponiveis = ['TODOS'] + opcoes['Código Equipe']
+    equipes_selecionadas = st.sidebar.multiselect("Equipe", equipes_disponiveis, default=['TODOS'])
+
+    # Filtro por Resultado
+    resultados_disponiveis = ['TODOS'] + opcoes['Resultado']
+    resultados_selecionados = st.sidebar.multiselect("Resultado", resultados_disponiveis, default=['TODOS'])
+
+    # Os indicadores, gráficos e resumos são calculados sobre o cubo de contagens
+    filtros = {
+        'Setor': None if 'TODOS' in setores_selecionados else setores_selecionados,
+        'Código Equipe': None if 'TODOS' in equipes_selecionadas else equipes_selecionadas,
+        'Resultado': None if 'TODOS' in resultados_selecionados else resultados_selecionados
+    }
+    chave = _chave_filtros(filtros)
+
+    # Posições das linhas filtradas pelo índice de bitmaps (usadas na tabela de dados);
+    # a tabela só materializa as linhas da página visível
+    linhas = indice.posicoes(filtros)
+    medidor.marcar('filtro', linhas=len(df_original) if linhas is None else len(linhas))
+
+    # Tabela de dados expansível
+    with st.expander("Exibir/Ocultar Tabela de Dados"):
+        exibir_tabela_paginada(df_original, (versao, chave), 'tabela_producao', linhas=linhas)
+
+    st.markdown("---")
+    # --- CARTÕES DE INDICADORES (KPIs) ---
+    resumo = resumo_filtros(cubo, versao, chave)
+    medidor.marcar('agregacao', em_cache=True)
+
+    kpi1, kpi2, kpi3 = st.columns(3)
+    kpi1.metric(label="Total de Atividades", value=f"{resumo['total']}")
+    kpi2.metric(label="Total Produtivo", value=f"{resumo['produtivo']}")
+    kpi3.metric(label="Taxa de Produtividade", value=f"{resumo['taxa']:.2f}%")
+    medidor.marcar('render')
+
+    st.markdown("---")
+
+    col1, col2 = st.columns(2)
+
+    # Coluna 1: Gráfico de Produtividade por Equipe (com filtro individual)
+    with col1:
+        st.subheader("Produtividade por Equipe")
+        if not resumo['vazio']:
+            _grafico_equipes(cubo, versao, chave, resumo['equipes'], medidor)
+        else:
+            st.warning("Nenhum dado para exibir com os filtros atuais.")
+
+    # Coluna 2: Gráfico de Produtividade por Setor (com filtro individual)
+    with col2:
+        st.subheader("Produtividade por Setor")
+        if not resumo['vazio']:
+            _grafico_setores(cubo, versao, chave, resumo['setores'], medidor)
+        else:
+            st.warning("Nenhum dado para exibir com os filtros atuais.")
+
+    st.markdown("---")
+
+    # --- Layout em Colunas para as Tabelas de Resumo ---
+    col3, col4 = st.columns(2)
+    if not resumo['vazio']:
+        resumo_equipe, resumo_servico, total_geral_servico = tabelas_resumo(cubo, versao, chave)
+        medidor.marcar('agregacao', em_cache=True)
+
+    # Coluna 3: Tabela de Resumo por Equipe
+    with col3:
+        st.subheader("Resumo por Equipe")
+        if not resumo['vazio']:
+            altura_tabela = (len(resumo_equipe.index) + 1) * 35 + 3
+            st.dataframe(resumo_equipe[['PRODUTIVO', 'IMPRODUTIVO', 'Total Geral']], height=altura_tabela)
+        else:
+            st.warning("Nenhum dado para exibir com os filtros atuais.")
+
+    # Coluna 4: Tabela de Resumo por Serviço
+    with col4:
+        st.subheader("Resumo por Serviço")
+        if not resumo['vazio']:
+            st.dataframe(resumo_servico[['PRODUTIVO', 'IMPRODUTIVO', 'Total Geral']])
+            st.dataframe(total_geral_servico)
+        else:
+            st.warning("Nenhum dado para exibir ou colunas 'Setor' e 'Resultado' não encontradas.")
+
+    medidor.marcar('render')
+    return chave
@@ -0,0 +1,132 @@
+"""
+Repositório local de bases de dados, com versões.
+
+Cada base (por nome) é uma pasta com um arquivo Parquet (zstd) por versão e um
+manifesto JSON com a lista de versões:
+
+    base de dados/repositorio/<nome>/manifesto.json
+    base de dados/repositorio/<nome>/v0003.parquet
+
+Uma versão nova só é criada quando o conteúdo muda (hash dos dados), e só as
+últimas MAX_VERSOES são mantidas. Planilhas .xlsx entram por `ingerir_planilha`
+(ou pelo `converter_base.py`), snapshots do Google Sheets por `salvar_versao`.
+Qualquer página abre uma base com `abrir(nome[, versao])`: a leitura usa memory
+map e o DataFrame fica em cache no processo.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from utils.cache_planilhas import ler_excel_em_blocos, ler_parquet, salvar_parquet
+from utils.instrumentacao import registrar_execucao
+
+PASTA_REPOSITORIO = Path(os.environ.get("SOC_PASTA_REPOSITORIO", "base de dados/repositorio"))
+
+# Quantidade de versões guardadas de cada base (as mais antigas são apagadas)
+MAX_VERSOES = int(os.environ.get("SOC_VERSOES_MANTIDAS", "10"))
+
+_lock = threading.Lock()
+
+
+def _pasta(nome):
+    return PASTA_REPOSITORIO / nome
+
+
+def versoes(nome):
+    """
+    Versões guardadas da base `nome` (da mais antiga para a mais recente); lista
+    vazia se a base não existir.
+    """
+    try:
+        with open(_pasta(nome) / "manifesto.json", encoding="utf-8") as f:
+            return json.load(f)["versoes"]
+    except FileNotFoundError:
+        return []
+
+
+def _gravar_manifesto(nome, lista):
+    caminho = _pasta(nome) / "manifesto.json"
+    temporario = caminho.with_suffix(f".{os.getpid()}.tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({"nome": nome, "versoes": lista}, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def hash_dados(df):
+    """
+    Hash do conteúdo de um DataFrame (nomes das colunas e valores, sem o índice).
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def salvar_versao(nome, df, origem=None):
+    """
+    Guarda `df` como nova versão da base `nome` e retorna o número da versão. Se
+    o conteúdo for igual ao da última versão, nada é gravado e ela é retornada.
+    """
+    hash_atual = hash_dados(df)
+    with _lock:
+        lista = versoes(nome)
+        if lista and lista[-1]["hash"] == hash_atual:
+            return lista[-1]["versao"]
+
+        versao = lista[-1]["versao"] + 1 if lista else 1
+        arquivo = f"v{versao:04d}.parquet"
+        salvar_parquet(df, _pasta(nome) / arquivo)
+        lista.append({
+            "versao": versao,
+            "arquivo": arquivo,
+            "criado_em": datetime.now().isoformat(timespec="seconds"),
+            "origem": origem,
+            "linhas": len(df),
+            "colunas": [str(col) for col in df.columns],
+            "hash": hash_atual,
+            "bytes": (_pasta(nome) / arquivo).stat().st_size,
+        })
+
+        # Remove as versões excedentes depois de o manifesto novo estar gravado
+        excedentes, lista = lista[:-MAX_VERSOES], lista[-MAX_VERSOES:]
+        _gravar_manifesto(nome, lista)
+        for antiga in excedentes:
+            (_pasta(nome) / antiga["arquivo"]).unlink(missing_ok=True)
+        return versao
+
+
+def ingerir_planilha(nome, caminho, preparar=lambda df: df, colunas=None):
+    """
+    Lê a primeira aba de um .xlsx (em blocos, como no upload) e a guarda como nova
+    versão da base `nome`. Retorna (versão, DataFrame).
+    """
+    df = ler_excel_em_blocos(Path(caminho).read_bytes(), preparar, colunas=colunas)
+    return salvar_versao(nome, df, origem=str(caminho)), df
+
+
+@st.cache_resource(max_entries=8)
+def _ler_versao(nome, versao):
+    registrar_execucao()
+    registro = next((r for r in versoes(nome) if r["versao"] == versao), None)
+    if registro is None:
+        raise KeyError(f"A base '{nome}' não tem a versão {versao}.")
+    return ler_parquet(_pasta(nome) / registro["arquivo"])
+
+
+def abrir(nome, versao=None):
+    """
+    Retorna (DataFrame, versão) da base `nome`; `versao=None` abre a mais recente.
+    O DataFrame é compartilhado entre as sessões e não deve ser alterado.
+    """
+    if versao is None:
+        lista = versoes(nome)
+        if not lista:
+            raise KeyError(f"A base '{nome}' não existe no repositório.")
+        versao = lista[-1]["versao"]
+    return _ler_versao(nome, versao), versao
@@ -0,0 +1,180 @@
+"""
+Sincronização incremental de abas do Google Sheets.
+
+Em vez de baixar a aba inteira a cada atualização, o `SincronizadorPlanilha`
+guarda um snapshot local e busca apenas as linhas acrescentadas desde a última
+sincronização. Se a planilha mudou de outra forma (cabeçalho alterado, linhas
+apagadas ou editadas no fim da base), faz uma leitura completa.
+
+Só usa `get_all_values()` e `batch_get()` do `Worksheet`, então pode ser testado
+com um objeto falso que implemente esses dois métodos.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+def nomes_unicos(colunas):
+    """
+    Remove espaços dos nomes das colunas e numera os nomes repetidos (Erro, Erro_1, ...).
+    """
+    cols, counts = [], {}
+    for col in (str(c).strip() for c in colunas):
+        if col in counts:
+            counts[col] += 1
+            cols.append(f"{col}_{counts[col]}")
+        else:
+            counts[col] = 0
+            cols.append(col)
+    return cols
+
+
+def concatenar(df_a, df_b):
+    """
+    Junta dois DataFrames mantendo como categoria as colunas categóricas.
+    """
+    if df_a.empty:
+        return df_b
+    if df_b.empty:
+        return df_a
+    df = pd.concat([df_a, df_b], ignore_index=True)
+    for col in df_a.columns:
+        if isinstance(df_a[col].dtype, pd.CategoricalDtype) and isinstance(df_b[col].dtype, pd.CategoricalDtype):
+            df[col] = union_categoricals([df_a[col], df_b[col]])
+    return df
+
+
+def juntar_com_origem(frames, coluna="Origem"):
+    """
+    Junta os DataFrames de várias abas ({origem: DataFrame}) num só, com a coluna
+    categórica `coluna` indicando a origem de cada linha. Os DataFrames recebidos
+    não são alterados.
+    """
+    origens = list(frames)
+    tamanhos = [len(frames[o]) for o in origens]
+    df = pd.concat(list(frames.values()), ignore_index=True)
+    for col in df.columns:
+        blocos = [frames[o][col] for o in origens if col in frames[o].columns]
+        if len(blocos) == len(origens) and all(isinstance(b.dtype, pd.CategoricalDtype) for b in blocos):
+            df[col] = union_categoricals(blocos)
+    codigos = np.repeat(np.arange(len(origens), dtype=np.int16), tamanhos)
+    df[coluna] = pd.Categorical.from_codes(codigos, categories=origens)
+    return df
+
+
+def _letra_coluna(numero):
+    """
+    Converte o número de uma coluna (1, 2, ...) na sua letra (A, B, ..., AA).
+    """
+    letras = ""
+    while numero > 0:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _sem_vazios_no_fim(linha):
+    """
+    O Sheets omite as células vazias do fim da linha; isto permite comparar linhas.
+    """
+    linha = list(linha)
+    while linha and linha[-1] == "":
+        linha.pop()
+    return linha
+
+
+class SincronizadorPlanilha:
+    """
+    Mantém o snapshot de uma aba e o atualiza de forma incremental.
+
+    `preparar` (opcional) recebe cada bloco novo de linhas já como DataFrame e
+    devolve o bloco limpo, que é então anexado ao DataFrame em cache.
+    `intervalo_completo` define, em segundos, de quanto em quanto tempo uma
+    leitura completa é forçada, para capturar edições no meio da base.
+    """
+
+    def __init__(self, preparar=None, intervalo_completo=3600):
+        self.preparar = preparar
+        self.intervalo_completo = intervalo_completo
+        self.cabecalho = None
+        self.ultima_linha = None
+        self.total_linhas = 0
+        self.df = None
+        self.ultima_sincronizacao = None
+        self.ultima_completa = None
+        self.ultimo_modo = None
+        self._lock = threading.Lock()
+
+    def _montar_frame(self, linhas):
+        largura = len(self.cabecalho)
+        linhas = [list(l[:largura]) + [""] * (largura - len(l)) for l in linhas]
+        df = pd.DataFrame(linhas, columns=nomes_unicos(self.cabecalho))
+        return self.preparar(df) if self.preparar is not None else df
+
+    def _sincronizacao_completa(self, worksheet):
+        valores = worksheet.get_all_values()
+        self.cabecalho = _sem_vazios_no_fim(valores[0]) if valores else []
+        linhas = valores[1:]
+        self.total_linhas = len(linhas)
+        self.ultima_linha = _sem_vazios_no_fim(linhas[-1]) if linhas else None
+        self.df = self._montar_frame(linhas)
+        self.ultima_completa = time.time()
+        self.ultimo_modo = "completa"
+
+    def _sincronizacao_incremental(self, worksheet):
+        """
+        Lê o cabeçalho e, a partir da última linha conhecida, o resto da aba numa
+        única chamada. Retorna False se a planilha não pôde ser atualizada só com
+        as linhas novas.
+        """
+        primeira = self.total_linhas + 1  # linha da planilha com o último registro conhecido
+        if self.ultima_linha is None:
+            primeira += 1
+        faixa = f"A{primeira}:{_letra_coluna(max(len(self.cabecalho), 1))}"
+        cabecalho, novas = worksheet.batch_get(["1:1", faixa])
+
+        cabecalho = _sem_vazios_no_fim(cabecalho[0]) if cabecalho else []
+        if cabecalho != self.cabecalho:
+            return False
+
+        novas = list(novas)
+        if self.ultima_linha is not None:
+            # A linha de referência precisa continuar igual; senão a base foi editada
+            if not novas or _sem_vazios_no_fim(novas[0]) != self.ultima_linha:
+                return False
+            novas = novas[1:]
+
+        if novas:
+            self.df = concatenar(self.df, self._montar_frame(novas))
+            self.total_linhas += len(novas)
+            self.ultima_linha = _sem_vazios_no_fim(novas[-1])
+            self.ultimo_modo = "incremental"
+        else:
+            self.ultimo_modo = "sem alterações"
+        return True
+
+    def reiniciar(self):
+        """
+        Descarta o snapshot; a próxima sincronização será completa.
+        """
+        with self._lock:
+            self.df = None
+
+    def sincronizar(self, worksheet):
+        """
+        Atualiza o snapshot a partir do `worksheet` e retorna o DataFrame resultante.
+        """
+        with self._lock:
+            agora = time.time()
+            precisa_completa = (
+                self.df is None
+                or not self.cabecalho
+                or agora - self.ultima_completa >= self.intervalo_completo
+            )
+            if precisa_completa or not self._sincronizacao_incremental(worksheet):
+                self._sincronizacao_completa(worksheet)
+            self.ultima_sincronizacao = agora
+            return self.df
@@ -0,0 +1,147 @@
+"""
+Tabela de dados paginada, com busca e ordenação feitas no servidor.
+
+Passar o DataFrame filtrado inteiro para `st.dataframe` serializa todas as linhas
+(Arrow) e as envia ao navegador a cada rerun, mesmo com o expander fechado.
+Aqui só a página visível é enviada. Os filtros chegam como um vetor de posições
+(sem recortar o DataFrame); a busca e a ordenação geram outro vetor, em cache
+por (dados, busca, ordenação), e a cada rerun só as linhas da janela são
+materializadas. A tabela é um fragmento: trocar de página, buscar ou
+ordenar não reexecuta o resto da página.
+
+Os vetores de posições são compartilhados entre as sessões e limitados pela
+memória que ocupam (SOC_POSICOES_MAX_MB), e não pela quantidade: os usados há
+mais tempo são descartados primeiro.
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.instrumentacao import registrar_execucao
+
+TAMANHOS_PAGINA = [50, 100, 500]
+SEM_ORDENACAO = '(ordem original)'
+
+# Formato das datas na tabela (e na busca)
+FORMATO_DATA = '%d/%m/%Y'
+
+# Memória máxima dos vetores de posições guardados, somando todas as sessões
+MAX_POSICOES_MB = float(os.environ.get("SOC_POSICOES_MAX_MB", "64"))
+
+_posicoes = OrderedDict()
+_lock_posicoes = threading.Lock()
+
+
+def _mascara_busca(df, texto):
+    """
+    Linhas em que alguma coluna contém `texto` (sem diferenciar maiúsculas).
+    Nas colunas categóricas a busca é feita só no dicionário de valores, e nas
+    de data só nas datas distintas, no formato exibido (dd/mm/aaaa).
+    """
+    mascara = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            encontrados = serie.cat.categories.astype(str).str.contains(texto, case=False, regex=False)
+            if encontrados.any():
+                mascara |= np.isin(serie.cat.codes.to_numpy(), np.flatnonzero(encontrados))
+        elif pd.api.types.is_datetime64_any_dtype(serie):
+            codigos, datas = pd.factorize(serie)
+            encontrados = datas.strftime(FORMATO_DATA).str.contains(texto, case=False, regex=False)
+            if encontrados.any():
+                mascara |= np.isin(codigos, np.flatnonzero(encontrados))
+        else:
+            mascara |= serie.astype(str).str.contains(texto, case=False, regex=False, na=False).to_numpy()
+    return mascara
+
+
+def _ordenar(serie, crescente):
+    """
+    Posições que ordenam a série (vazios no fim). Categorias são ordenadas pelo
+    texto, e não pela ordem em que aparecem no dicionário.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        posicao_no_texto = np.argsort(np.argsort(serie.cat.categories.astype(str).to_numpy()))
+        codigos = serie.cat.codes.to_numpy()
+        serie = pd.Series(np.where(codigos >= 0, posicao_no_texto[codigos], np.nan))
+    else:
+        serie = serie.reset_index(drop=True)
+    return serie.sort_values(ascending=crescente, kind='stable', na_position='last').index.to_numpy()
+
+
+def posicoes_em_cache(df, chave_dados, busca, coluna, crescente, linhas=None):
+    """
+    Posições (iloc) das linhas exibidas, na ordem de exibição; `None` = todas, na
+    ordem original. `linhas` são as posições que passaram pelos filtros (`None` =
+    todas); `chave_dados` identifica o DataFrame e as linhas (versão + filtros).
+    """
+    if not busca and coluna == SEM_ORDENACAO:
+        return linhas
+    chave = (chave_dados, busca, coluna, crescente)
+    with _lock_posicoes:
+        if chave in _posicoes:
+            _posicoes.move_to_end(chave)
+            return _posicoes[chave]
+
+    registrar_execucao()
+    # int32 basta para as posições e ocupa metade da memória
+    posicoes = _calcular_posicoes(df, busca, coluna, crescente, linhas).astype(np.int32 if len(df) < 2 ** 31 else np.int64)
+    with _lock_posicoes:
+        _posicoes[chave] = posicoes
+        _posicoes.move_to_end(chave)
+        limite = MAX_POSICOES_MB * 1024 ** 2
+        total = sum(p.nbytes for p in _posicoes.values())
+        # Descarta os mais antigos; o recém-calculado fica mesmo se passar do limite
+        while total > limite and len(_posicoes) > 1:
+            _, antigo = _posicoes.popitem(last=False)
+            total -= antigo.nbytes
+    return posicoes
+
+
+def _calcular_posicoes(df, busca, coluna, crescente, posicoes):
+    """
+    Aplica a busca e a ordenação às posições `posicoes` (`None` = todas).
+    """
+    if busca:
+        mascara = _mascara_busca(df, busca)
+        posicoes = np.flatnonzero(mascara) if posicoes is None else posicoes[mascara[posicoes]]
+    if coluna != SEM_ORDENACAO:
+        serie = df[coluna] if posicoes is None else df[coluna].iloc[posicoes]
+        ordem = _ordenar(serie, crescente)
+        posicoes = ordem if posicoes is None else posicoes[ordem]
+    return posicoes
+
+
+@st.fragment
+def exibir_tabela_paginada(df, chave_dados, chave, column_config=None, linhas=None):
+    """
+    Exibe `df` página a página; `linhas` (opcional) limita a tabela às posições
+    indicadas. `chave_dados` deve mudar sempre que o conteúdo de `df` ou as
+    `linhas` mudarem; `chave` distingue os widgets de tabelas diferentes.
+    """
+    col_busca, col_ordem, col_sentido, col_tamanho = st.columns([3, 2, 1, 1])
+    busca = col_busca.text_input("Buscar", key=f"{chave}_busca").strip()
+    coluna = col_ordem.selectbox("Ordenar por", [SEM_ORDENACAO] + list(df.columns), key=f"{chave}_ordem")
+    crescente = col_sentido.toggle("Crescente", value=True, key=f"{chave}_crescente")
+    tamanho = col_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1, key=f"{chave}_tamanho")
+
+    posicoes = posicoes_em_cache(df, chave_dados, busca, coluna, crescente, linhas)
+    total = len(df) if posicoes is None else len(posicoes)
+    paginas = max(1, math.ceil(total / tamanho))
+
+    # A quantidade de páginas muda com a busca e os filtros: mantém a página válida
+    chave_pagina = f"{chave}_pagina"
+    if st.session_state.get(chave_pagina, 1) > paginas:
+        st.session_state[chave_pagina] = paginas
+    pagina = st.number_input("Página", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+
+    inicio = (pagina - 1) * tamanho
+    fim = min(inicio + tamanho, total)
+    janela = df.iloc[inicio:fim] if posicoes is None else df.iloc[posicoes[inicio:fim]]
+    st.dataframe(janela, column_config=column_config)
+    st.caption(f"Linhas {inicio + 1 if total else 0}–{fim} de {total}")